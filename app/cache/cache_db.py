@@ -5,27 +5,174 @@ PDF 요약·실행 로그·사용자 피드백을 Redis에 임시 보관하는 
 ===========
 1. 날짜별 HSET 구분 – 요약은 `pdf:summaries:YYYY-MM-DD` 형식 HSET에 저장해
    하루 단위 만료(TTL) 관리가 쉽습니다.
-2. 메타데이터 키 – `pdf:metadata:<file_id>` 키에 날짜 버킷 정보를 따로 기록해
-   존재 여부를 빠르게 확인합니다.
+2. 메타데이터 키 – `pdf:metadata:<file_id>` hash 에 날짜 버킷 정보를 따로
+   기록해 존재 여부를 빠르게 확인합니다(`date`, `timestamp`, `ttl_days` 필드).
 3. **TTL 관리** – 기본 보존 기간은 7일(`REDIS_TTL_DAYS`)이며, 모두 초(second)
    단위 TTL 로 설정해 계산을 단순화했습니다.
+4. **커넥션 풀** – 접속 정보별로 모듈 수준 풀을 하나씩 두어, 어댑터를 직접
+   생성하는 스크립트에서도 TCP 연결을 매번 새로 맺지 않습니다. 풀이 가득 차면
+   오류 대신 `REDIS_POOL_TIMEOUT` 초까지 빈 연결을 기다립니다(Blocking pool).
 
 환경 변수
 ---------
 - `REDIS_HOST`, `REDIS_PORT`, `REDIS_DB` : Redis 접속 정보
 - `REDIS_TTL_DAYS`                     : 기본 보존 기간(일)
+- `REDIS_POOL_SIZE`                    : 엔드포인트별 커넥션 풀 최대 크기(기본 32)
+- `REDIS_POOL_TIMEOUT`                 : 풀이 가득 찼을 때 연결 대기 시간(초, 기본 5)
+- `LLM_CACHE_TTL`                      : LLM 판정 응답 캐시 TTL(초, 기본 86400)
+
+캐시 동작은 `AsyncRedisCacheDB` 한 곳에만 구현한다. 동기 `RedisCacheDB` 는
+동기 코드가 실제로 쓰는 최소 메서드만 같은 키 구조(`_CacheKeys`)로 제공한다.
 """
 
 import os
+import logging
 import redis
+import redis.asyncio
 from functools import lru_cache
 from typing import Optional, Dict, List
 from datetime import datetime, timedelta
 import json
+import re
 from zoneinfo import ZoneInfo
 
-class RedisCacheDB:
-    """Redis 캐시 어댑터.
+_TZ = ZoneInfo("Asia/Seoul")
+_SUMMARY_PREFIX = "pdf:summaries:"
+
+# 메타데이터 조회 → TTL 갱신 → 요약 HGET 을 서버 측에서 한 번에 처리한다.
+# KEYS[1] = pdf:metadata:<fid>, ARGV = {fid, ttl_seconds, "pdf:summaries:"}
+# 이전 형식(JSON 문자열) 메타데이터는 hash 가 아니므로 없는 것으로 취급한다.
+_GET_PDF_LUA = """
+if redis.call('TYPE', KEYS[1]).ok ~= 'hash' then return nil end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+local d = redis.call('HGET', KEYS[1], 'date')
+if not d then return nil end
+return redis.call('HGET', ARGV[3] .. d, ARGV[1])
+"""
+
+_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "32"))
+_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+_LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))
+
+# ----- 커넥션 풀 ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def get_pool(host: str, port: int, db: int) -> redis.BlockingConnectionPool:
+    """엔드포인트별 동기 커넥션 풀. 인스턴스를 새로 만들어도 소켓을 재사용한다.
+
+    일반 `ConnectionPool` 은 한도를 넘으면 즉시 "Too many connections" 를 던지므로,
+    동시 요청이 몰려도 잠시 기다리도록 blocking 풀을 쓴다.
+    """
+    return redis.BlockingConnectionPool(
+        host=host, port=port, db=db,
+        decode_responses=True, max_connections=_POOL_SIZE, timeout=_POOL_TIMEOUT,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_pool(host: str, port: int, db: int) -> redis.asyncio.BlockingConnectionPool:
+    """`get_pool` 과 같은 엔드포인트를 가리키는 비동기 blocking 커넥션 풀."""
+    return redis.asyncio.BlockingConnectionPool(
+        host=host, port=port, db=db,
+        decode_responses=True, max_connections=_POOL_SIZE, timeout=_POOL_TIMEOUT,
+    )
+
+
+# 요약 HDEL · 메타데이터 DEL · 삭제 로그 RPUSH 를 한 번에 처리한다.
+# KEYS = {date_key, metadata_key, cache:deleted:<date>}, ARGV = {fid, log entry}
+_DELETE_PDF_LUA = """
+local n = redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('DEL', KEYS[2])
+if n > 0 then redis.call('RPUSH', KEYS[3], ARGV[2]) end
+return n
+"""
+
+log = logging.getLogger(__name__)
+
+_GLOB_SPECIAL = re.compile(r"[\\*?\[\]]")  # HSCAN MATCH 패턴 이스케이프 대상
+_HSCAN_COUNT  = 500
+
+class _CacheKeys:
+    """동기·비동기 캐시 어댑터가 공유하는 키 생성 헬퍼."""
+
+    ttl_days: int
+
+    # ----- 내부 키 생성 -------------------------------------------------    
+    def _get_date_key(self, date: datetime = None) -> str:
+        """`pdf:summaries:YYYY-MM-DD` 형태 날짜 버킷 키 반환."""
+        if date is None:
+            date = datetime.now(_TZ)
+        return f"{_SUMMARY_PREFIX}{date.date().isoformat()}"
+    
+    def _recent_date_keys(self) -> List[str]:
+        """오늘부터 `ttl_days`일 전까지의 날짜 버킷 키 목록 (최신순)."""
+        today = datetime.now(_TZ).date()
+        return [
+            f"{_SUMMARY_PREFIX}{(today - timedelta(days=i)).isoformat()}"
+            for i in range(self.ttl_days)
+        ]
+
+    def _get_metadata_key(self, file_id: str) -> str:
+        """`pdf:metadata:<file_id>` 키 반환."""
+        return f"pdf:metadata:{file_id}"
+
+    def _feedback_date_keys(self) -> List[str]:
+        """오늘부터 `ttl_days + 1`일 전까지의 `feedback:YYYY-MM-DD` 키 목록."""
+        today = datetime.now(_TZ).date()
+        return [
+            f"feedback:{(today - timedelta(days=i)).isoformat()}"
+            for i in range(self.ttl_days + 1)
+        ]
+
+    @staticmethod
+    def _llm_key(file_id: str) -> str:
+        """`llm:resp:<file_id>` hash 키 반환 (field = 프롬프트 sha256)."""
+        return f"llm:resp:{file_id}"
+
+    @staticmethod
+    def _feedback_match(file_id: str) -> str:
+        """file_id 에 glob 특수문자가 있어도 접두사 그대로 매칭되는 HSCAN 패턴."""
+        return _GLOB_SPECIAL.sub(r"\\\g<0>", file_id) + "|*"
+
+    # ----- 직렬화 헬퍼 -------------------------------------------------
+    def _pdf_metadata(self, now: datetime) -> Dict[str, str]:
+        """`pdf:metadata:<file_id>` hash 에 저장할 필드."""
+        return {
+            'date': now.date().isoformat(),
+            'timestamp': now.isoformat(),
+            'ttl_days': str(self.ttl_days)
+        }
+
+    @staticmethod
+    def _deletion_entry(file_id: str):
+        """`(cache:deleted:<date> 키, 로그 항목)` 반환."""
+        now = datetime.now(_TZ)
+        return f"cache:deleted:{now.date().isoformat()}", f"{file_id}|{now.isoformat()}"
+
+    @staticmethod
+    def _log_entry(file_id: str, url: str, query: str, lang: str, msg: str):
+        """`(log_key, field, value)` 로그 HSET 인자 반환."""
+        now = datetime.now()
+        log_value = {
+            "file_id": file_id,
+            "url": url,
+            "query": query,
+            "lang": lang,
+            "time": now.strftime("%H:%M:%S"),
+            "msg": msg
+        }
+        return (
+            f"log:{now:%Y-%m-%d}",
+            now.strftime("%Y-%m-%d %H:%M:%S"),
+            json.dumps(log_value),
+        )
+
+
+class RedisCacheDB(_CacheKeys):
+    """동기 Redis 캐시 어댑터 (스크립트·동기 관리 경로 전용).
+
+    요약·로그·피드백 읽기/쓰기는 모두 `AsyncRedisCacheDB` 가 담당하며, 여기에는
+    동기 코드(`VectorDB.delete_document` 등)가 실제로 쓰는 메서드만 둔다. 같은 동작을
+    두 벌 유지하지 않도록, 필요해지면 새로 복사하기보다 비동기 경로를 사용한다.
 
     Parameters
     ----------
@@ -45,157 +192,194 @@ class RedisCacheDB:
         db: int = int(os.getenv("REDIS_DB", "0")),
         ttl_days: int = int(os.getenv("REDIS_TTL_DAYS", "7"))
     ):
-        self.r = redis.Redis(host=host, port=port, db=db, decode_responses=True)
+        self.r = redis.Redis(connection_pool=get_pool(host, port, db))
         self.ttl_days = ttl_days
-        
-    # ----- 내부 키 생성 -------------------------------------------------    
-    def _get_date_key(self, date: datetime = None) -> str:
-        """`pdf:summaries:YYYY-MM-DD` 형태 날짜 버킷 키 반환."""
-        if date is None:
-            date = datetime.now(ZoneInfo("Asia/Seoul"))
-        return f"pdf:summaries:{date.strftime('%Y-%m-%d')}"
-    
-    def _get_metadata_key(self, file_id: str) -> str:
-        """`pdf:metadata:<file_id>` 키 반환."""
-        return f"pdf:metadata:{file_id}"
+
+    # ----- LLM 응답 캐시 ----------------------------------------------
+    def delete_llm_responses(self, file_id: str) -> bool:
+        """해당 PDF 의 LLM 응답 캐시(`llm:resp:<file_id>` hash)를 지운다."""
+        return bool(self.r.unlink(self._llm_key(file_id)))
+
+
+class AsyncRedisCacheDB(_CacheKeys):
+    """`redis.asyncio` 기반 비동기 캐시 어댑터.
+
+    async FastAPI 핸들러·LangGraph 노드에서 사용하며, 소켓 I/O 동안 이벤트
+    루프를 점유하지 않는다. 요약·로그·피드백·LLM 응답 캐시의 유일한 구현이다.
+
+    Parameters
+    ----------
+    host : str, optional
+        Redis 호스트명.
+    port : int, optional
+        Redis 포트 번호.
+    db : int, optional
+        Redis 논리 DB.
+    ttl_days : int, optional
+        요약·피드백 기본 보존 기간(일).
+    """
+    def __init__(
+        self,
+        host: str = os.getenv("REDIS_HOST", "localhost"),
+        port: int = int(os.getenv("REDIS_PORT", "6379")),
+        db: int = int(os.getenv("REDIS_DB", "0")),
+        ttl_days: int = int(os.getenv("REDIS_TTL_DAYS", "7")),
+    ):
+        self.r = redis.asyncio.Redis(connection_pool=get_async_pool(host, port, db))
+        self.ttl_days = ttl_days
+        # EVALSHA 호출, NOSCRIPT 발생 시 자동으로 스크립트 재적재
+        self._get_pdf_script = self.r.register_script(_GET_PDF_LUA)
+        self._delete_pdf_script = self.r.register_script(_DELETE_PDF_LUA)
 
     # ----- 요약본 조회 -------------------------------------------------
-    def get_pdf(self, fid: str) -> Optional[str]:
+    async def get_pdf(self, fid: str) -> Optional[str]:
         """요약본을 찾으면 문자열을, 없으면 None."""
-        metadata_key = self._get_metadata_key(fid)
-        metadata = self.r.get(metadata_key)
-
-        if metadata:
-            self.r.expire(metadata_key, self.ttl_days * 86400)
-            meta = json.loads(metadata)
-            date_key = f"pdf:summaries:{meta['date']}"
-            summary = self.r.hget(date_key, fid)
-            if summary:
-                return summary
-        
-        for i in range(self.ttl_days):
-            date = datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(days=i)
-            date_key = self._get_date_key(date)
-            summary = self.r.hget(date_key, fid)
-            if summary:
-                return summary
-        
-        return None
-
-    def exists_pdf(self, fid: str) -> bool:
+        summary = await self._get_pdf_script(
+            keys=[self._get_metadata_key(fid)],
+            args=[fid, self.ttl_days * 86400, _SUMMARY_PREFIX],
+        )
+        if summary:
+            return summary
+
+        # 메타데이터가 없으면 날짜 버킷 전체를 한 번의 왕복으로 조회
+        async with self.r.pipeline(transaction=False) as pipe:
+            for date_key in self._recent_date_keys():
+                pipe.hget(date_key, fid)
+            summaries = await pipe.execute()
+
+        return next((s for s in summaries if s), None)
+
+    async def exists_pdf(self, fid: str) -> bool:
         """요약 존재 여부만 확인 (내용은 가져오지 않음)."""
         metadata_key = self._get_metadata_key(fid)
-        if self.r.exists(metadata_key):
-            self.r.expire(metadata_key, self.ttl_days * 86400)
+        if await self.r.exists(metadata_key):
+            await self.r.expire(metadata_key, self.ttl_days * 86400)
             return True
 
-        now = datetime.now(ZoneInfo("Asia/Seoul"))
-        for i in range(self.ttl_days):
-            date_key = self._get_date_key(now - timedelta(days=i))
-            if self.r.hexists(date_key, fid):
-                return True
-
-        return False
+        async with self.r.pipeline(transaction=False) as pipe:
+            for date_key in self._recent_date_keys():
+                pipe.hexists(date_key, fid)
+            return any(await pipe.execute())
 
     # ----- 요약본 저장 / 삭제 -----------------------------------------
-    def set_pdf(self, fid: str, s: str):
+    async def set_pdf(self, fid: str, s: str):
         """요약 저장 & 메타데이터 갱신."""
-        now = datetime.now(ZoneInfo("Asia/Seoul"))
+        now = datetime.now(_TZ)
         date_key = self._get_date_key(now)
-        
-        self.r.hset(date_key, fid, s)
-        
-        metadata = {
-            'date': now.strftime('%Y-%m-%d'),
-            'timestamp': now.isoformat(),
-            'ttl_days': self.ttl_days
-        }
-        self.r.setex(
-            self._get_metadata_key(fid), 
-            self.ttl_days * 86400,  # TTL in seconds
-            json.dumps(metadata)
-        )
-        
-        self.r.expire(date_key, (self.ttl_days + 1) * 86400)
+        metadata_key = self._get_metadata_key(fid)
+
+        # 요약·메타데이터·TTL 쓰기를 한 번의 왕복으로 묶는다.
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.hset(date_key, fid, s)
+            # 이전 포맷(JSON 문자열) 메타데이터 키에 HSET 하면 WRONGTYPE 이므로 먼저 지운다.
+            pipe.delete(metadata_key)
+            pipe.hset(metadata_key, mapping=self._pdf_metadata(now))
+            pipe.expire(metadata_key, self.ttl_days * 86400)  # TTL in seconds
+            pipe.expire(date_key, (self.ttl_days + 1) * 86400)
+            await pipe.execute()
 
-    def delete_pdf(self, fid: str) -> bool:
-        """요약·메타데이터 삭제 후 삭제 로그 남김."""
+    async def delete_pdf(self, fid: str) -> bool:
+        """요약·메타데이터·LLM 응답 캐시 삭제 후 삭제 로그 남김."""
+        await self.delete_llm_responses(fid)
         metadata_key = self._get_metadata_key(fid)
-        metadata = self.r.get(metadata_key)
-        deleted = False
-
-        if metadata:
-            meta = json.loads(metadata)
-            date_key = f"pdf:summaries:{meta['date']}"
-            deleted = bool(self.r.hdel(date_key, fid))
-            self.r.delete(metadata_key)
+        is_hash = await self.r.type(metadata_key) == "hash"
+        date = await self.r.hget(metadata_key, "date") if is_hash else None
+
+        if date:
+            date_key = f"{_SUMMARY_PREFIX}{date}"
         else:
-            for i in range(self.ttl_days):
-                date = datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(days=i)
-                date_key = self._get_date_key(date)
-                if self.r.hexists(date_key, fid):
-                    deleted = bool(self.r.hdel(date_key, fid))
-                    break
+            date_keys = self._recent_date_keys()
+            async with self.r.pipeline(transaction=False) as pipe:
+                for date_key in date_keys:
+                    pipe.hexists(date_key, fid)
+                found = await pipe.execute()
+            date_key = next((k for k, hit in zip(date_keys, found) if hit), None)
+            if date_key is None:
+                await self.r.delete(metadata_key)
+                return False
 
+        log_key, entry = self._deletion_entry(fid)
+        deleted = bool(await self._delete_pdf_script(
+            keys=[date_key, metadata_key, log_key], args=[fid, entry],
+        ))
         if deleted:
-            self._log_cache_deletion(fid)
+            log.info("Deleted cache entry for %s → %s / %s", fid, log_key, entry)
 
         return deleted
 
     # ----- 로그 --------------------------------------------------------
-    def set_log(self, file_id: str, url: str, query: str, lang: str, msg: str):
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-        timestamp = now.strftime("%H:%M:%S")
+    async def set_log(self, file_id: str, url: str, query: str, lang: str, msg: str):
+        await self.r.hset(*self._log_entry(file_id, url, query, lang, msg))
 
-        log_key = f"log:{date_str}"
-        log_value = {
-            "file_id": file_id,
-            "url": url,
-            "query": query,
-            "lang": lang,
-            "time": timestamp,
-            "msg": msg
-        }
-        self.r.hset(log_key, now.strftime("%Y-%m-%d %H:%M:%S"), json.dumps(log_value))
+    # ----- LLM 응답 캐시 ----------------------------------------------
+    async def get_llm_response(self, file_id: str, digest: str) -> Optional[str]:
+        """프롬프트 해시로 저장된 LLM 응답을 찾으면 문자열을, 없으면 None."""
+        return await self.r.hget(self._llm_key(file_id), digest)
+
+    async def set_llm_response(self, file_id: str, digest: str, value: str):
+        """LLM 응답을 파일별 hash 에 넣고, hash 전체 TTL 을 `LLM_CACHE_TTL` 초로 갱신한다.
+
+        요약·청크가 바뀌면 프롬프트 해시도 바뀌므로 별도 무효화 없이 옛 판정은
+        조회되지 않는다. 파일을 지울 때만 `delete_llm_responses` 로 한 번에 비운다.
+        """
+        key = self._llm_key(file_id)
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.hset(key, digest, value)
+            pipe.expire(key, _LLM_CACHE_TTL)
+            await pipe.execute()
 
-    def _log_cache_deletion(self, file_id: str):
-        now = datetime.now(ZoneInfo("Asia/Seoul"))
-        date_str = now.strftime('%Y-%m-%d')
-        date_key = f"cache:deleted:{date_str}"
-        entry = f"{file_id}|{now.isoformat()}"
-        self.r.rpush(date_key, entry)
-        print(f"[LOG] Deleted cache entry for {file_id} → {date_key} / {entry}")
+    async def delete_llm_responses(self, file_id: str) -> bool:
+        """해당 PDF 의 LLM 응답 캐시(`llm:resp:<file_id>` hash)를 지운다."""
+        return bool(await self.r.unlink(self._llm_key(file_id)))
 
     # ----- 피드백 ------------------------------------------------------
-    def add_feedback(self, file_id: str, fb_id: str, payload: dict):
+    async def add_feedback(self, file_id: str, fb_id: str, payload: dict):
         """
         Key   : feedback:<YYYY-MM-DD>
         Field : <file_id>|<fb_id>|<HH:MM:SS>
         Value : JSON 직렬화된 payload
         TTL   : summaries 정책과 동일 (ttl_days + 1 일)
         """
-        now = datetime.now(ZoneInfo("Asia/Seoul"))
-        date_key = f"feedback:{now:%Y-%m-%d}"
+        now = datetime.now(_TZ)
+        date_key = f"feedback:{now.date().isoformat()}"
         field    = f"{file_id}|{fb_id}|{now:%H:%M:%S}"
 
-        self.r.hset(date_key, field, json.dumps(payload))
-        self.r.expire(date_key, (self.ttl_days + 1) * 86_400)
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.hset(date_key, field, json.dumps(payload))
+            pipe.expire(date_key, (self.ttl_days + 1) * 86_400)
+            await pipe.execute()
 
-    def get_feedbacks(self, file_id: str) -> List[dict]:
+    async def get_feedbacks(self, file_id: str) -> List[dict]:
         """해당 PDF(file_id)에 달린 모든 피드백 반환."""
+        date_keys = self._feedback_date_keys()
+        match = self._feedback_match(file_id)
+
+        # 날짜별 첫 페이지는 한 번의 왕복으로 가져오고, 남은 커서만 개별 순회
+        async with self.r.pipeline(transaction=False) as pipe:
+            for date_key in date_keys:
+                pipe.hscan(date_key, 0, match=match, count=_HSCAN_COUNT)
+            pages = await pipe.execute()
+
         results: List[dict] = []
-        for i in range(self.ttl_days + 1):
-            date = datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(days=i)
-            date_key = f"feedback:{date:%Y-%m-%d}"
-            for field, val in self.r.hgetall(date_key).items():
-                if field.startswith(f"{file_id}|"):
+        for date_key, (cursor, fields) in zip(date_keys, pages):
+            while True:
+                for field, val in fields.items():
                     data = json.loads(val)
-                    data["id"] = field.split("|")[1]
+                    data["id"] = field.split("|", 2)[1]
                     results.append(data)
+                if not cursor:
+                    break
+                cursor, fields = await self.r.hscan(
+                    date_key, cursor, match=match, count=_HSCAN_COUNT
+                )
         return results
 
 # 싱글턴 ---------------------------------------------------------------
 @lru_cache(maxsize=1)
 def get_cache_db() -> "RedisCacheDB":
     return RedisCacheDB()
+
+
+@lru_cache(maxsize=1)
+def get_async_cache_db() -> "AsyncRedisCacheDB":
+    return AsyncRedisCacheDB()
@@ -9,6 +9,8 @@
 
 """
 
+from operator import attrgetter
+
 from fastapi import APIRouter, Depends
 from app.dto.chat_summary_dto import ChatSummaryRequestDTO
 from app.service.chat_summary_graph import (
@@ -33,10 +35,10 @@ async def summarize_chat(
     Returns:
         dict: {"summary"|"answer", "log", ...}
     """
-    # 채팅을 타임스탬프 기준 정렬한 뒤 한 줄 문자열로 변환
-    msgs = sorted(req.chats, key=lambda c: c.timestamp)
+    # 채팅을 타임스탬프 기준 (제자리) 정렬한 뒤 한 줄 문자열로 변환
+    req.chats.sort(key=attrgetter("timestamp"))
     lines = [f"[{c.timestamp:%Y-%m-%d %H:%M:%S}] {c.sender}: {c.plaintext}"
-             for c in msgs]
+             for c in req.chats]
 
     return await service.generate(lines, query=req.query, lang=req.lang)
 
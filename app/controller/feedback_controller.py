@@ -16,7 +16,7 @@ from fastapi import APIRouter, HTTPException, status
 
 # 내부 모듈 --------------------------------------------------------------
 from app.dto.feedback_dto import FeedbackCreate, FeedbackOut
-from app.cache.cache_db import get_cache_db     
+from app.cache.cache_db import get_async_cache_db
 
 # ────────────────────────── Router 설정 ────────────────────────────────
 router = APIRouter(prefix="/api")
@@ -45,8 +45,8 @@ async def create_feedback(dto: FeedbackCreate) -> FeedbackOut:
         created_at  = datetime.utcnow()
 
         # Redis 저장 ---------------------------------------------------
-        cache = get_cache_db()
-        cache.add_feedback(                         
+        cache = get_async_cache_db()
+        await cache.add_feedback(
             file_id=dto.file_id,
             fb_id=feedback_id,
             payload={
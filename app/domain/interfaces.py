@@ -41,7 +41,7 @@ class VectorStoreIF(Protocol):
     async def get_all(self, doc_id: str) -> List[TextChunk]: ...  # 전체 청크
 
     @abstractmethod
-    async def has_chunks(self, doc_id: str) -> bool: ...
+    async def has_chunks(self, doc_id: str) -> Optional[bool]: ...  # None = 확인 실패
 
 
 class LlmChainIF(Protocol):
@@ -58,11 +58,17 @@ class CacheIF(Protocol):
     """요약 캐싱(Port)."""
 
     @abstractmethod
-    def get_summary(self, key: str) -> Optional[str]: ...
+    async def get_summary(self, key: str) -> Optional[str]: ...
 
     @abstractmethod
-    def set_summary(self, key: str, summary: str) -> None: ...
+    async def set_summary(self, key: str, summary: str) -> None: ...
 
     @abstractmethod
-    def exists_summary(self, key: str) -> bool: ...
+    async def exists_summary(self, key: str) -> bool: ...
+
+    @abstractmethod
+    async def get_llm_response(self, file_id: str, digest: str) -> Optional[str]: ...
+
+    @abstractmethod
+    async def set_llm_response(self, file_id: str, digest: str, value: str) -> None: ...
 
@@ -9,7 +9,7 @@ Redis 캐시 어댑터.
 
 from typing import Optional
 from app.domain.interfaces import CacheIF
-from app.cache.cache_db import get_cache_db  # RedisCacheDB 싱글턴 반환
+from app.cache.cache_db import get_async_cache_db  # AsyncRedisCacheDB 싱글턴 반환
 
 
 class CacheStore(CacheIF):
@@ -17,25 +17,31 @@ class CacheStore(CacheIF):
 
     Attributes
     ----------
-    cache : RedisCacheDB
-        내부에서 재사용하는 Redis 싱글턴.
+    cache : AsyncRedisCacheDB
+        내부에서 재사용하는 비동기 Redis 싱글턴.
     """
 
     def __init__(self):
         # Redis 연결은 싱글턴으로 관리한다.
-        self.cache = get_cache_db() 
+        self.cache = get_async_cache_db()
 
     # ───────────────────── CacheIF 구현 ─────────────────────
-    def get_summary(self, key: str) -> Optional[str]:
-        return self.cache.get_pdf(key)
+    async def get_summary(self, key: str) -> Optional[str]:
+        return await self.cache.get_pdf(key)
 
-    def set_summary(self, key: str, summary: str) -> None:
-        self.cache.set_pdf(key, summary)
+    async def set_summary(self, key: str, summary: str) -> None:
+        await self.cache.set_pdf(key, summary)
 
-    def exists_summary(self, key: str) -> bool:
-        return self.cache.exists_pdf(key)
+    async def exists_summary(self, key: str) -> bool:
+        return await self.cache.exists_pdf(key)
 
-    def set_log(self, file_id: str, url: str, query: str, lang: str, msg: str):
+    async def set_log(self, file_id: str, url: str, query: str, lang: str, msg: str):
         """PDF 처리 단계별 로그를 Redis(HSET) 에 기록한다."""
-        self.cache.set_log(file_id, url, query, lang, msg)
+        await self.cache.set_log(file_id, url, query, lang, msg)
+
+    async def get_llm_response(self, file_id: str, digest: str) -> Optional[str]:
+        return await self.cache.get_llm_response(file_id, digest)
+
+    async def set_llm_response(self, file_id: str, digest: str, value: str) -> None:
+        await self.cache.set_llm_response(file_id, digest, value)
 
@@ -10,20 +10,19 @@ LLM 기반 Q&A 및 Map-Reduce 요약기.
 
 * **execute(prompt)** – 완전히 포맷된 프롬프트 문자열을 받아
   LLM 응답을 반환합니다.
-* **summarize(docs)** – 주어진 텍스트 청크들에 대해
-  LangChain의 ``map_reduce`` 방식으로 요약을 수행합니다.
+* **summarize(docs)** – 주어진 텍스트 청크들을 ``abatch``로 동시에 map 요약한
+  뒤, 부분 요약이 ``_TOKEN_MAX`` 를 넘으면 토큰 예산 단위로 묶어 ``abatch`` 로
+  접기(collapse)를 반복하고, 마지막에 한 번 combine 합니다.
 """
 
 
 from __future__ import annotations
 
+import os
 from typing import List
 import re
-from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
-from langchain.chains.summarize import load_summarize_chain
-from langchain.docstore.document import Document
 
 from app.infra.llm_factory import get_llm_instance
 from app.domain.interfaces import LlmChainIF, TextChunk
@@ -50,6 +49,14 @@ Please combine the summaries in a concise manner.
 /no_think
 """
 
+_MAP_CONCURRENCY = 16  # map 단계 동시 LLM 호출 수
+# combine 입력 토큰 상한 (load_summarize_chain 기본 token_max 와 동일).
+# 부분 요약 합이 이를 넘으면 예산 단위로 묶어 한 단계씩 접는다.
+_TOKEN_MAX = int(os.getenv("SUMMARY_TOKEN_MAX", "3000"))
+
+# <think>…</think> 블록 제거용 (모듈 로드 시 1회 컴파일)
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
 # ───────────────────── LLM 엔진 구현체 ─────────────────────
 
 class LlmEngine(LlmChainIF):
@@ -57,16 +64,12 @@ class LlmEngine(LlmChainIF):
 
     Attributes:
         llm: LangChain LLM 실행 객체 (OpenAI 또는 HuggingFace 기반).
-        map_prompt: 개별 문단 요약에 사용할 프롬프트 템플릿.
-        combine_prompt: 통합 요약에 사용할 프롬프트 템플릿.
         _qa_chain: prompt → LLM → 출력 문자열 파서 체인.
-        _summ_chain: 문서 리스트에 대한 map-reduce 요약 체인.
+            요약 map/combine 단계도 포맷된 문자열로 이 체인을 재사용한다.
     """
     def __init__(self, *, temperature: float = 0.7):
         # Shared LLM instance
         self.llm = get_llm_instance(temperature=temperature)
-        self.map_prompt = PromptTemplate(template=MAP_PROMPT, input_variables=["text"])
-        self.combine_prompt = PromptTemplate(template=COMBINE_PROMPT, input_variables=["text"])
 
         # LangChain Runnable 체인을 구성: 입력 문자열 그대로 전달 → LLM 실행 → 문자열로 파싱
         self._qa_chain = (
@@ -75,15 +78,6 @@ class LlmEngine(LlmChainIF):
             | StrOutputParser()
         )
 
-        # docs(list[str]) → map‑reduce → str (for *summarize*)
-        self._summ_chain = load_summarize_chain(
-            self.llm,
-            chain_type="map_reduce",
-            return_intermediate_steps=False,
-            map_prompt=self.map_prompt,
-            combine_prompt=self.combine_prompt,
-        )
-
     # ------------------------------------------------------------------
     # LlmChainIF implementation
     # ------------------------------------------------------------------
@@ -98,27 +92,66 @@ class LlmEngine(LlmChainIF):
             LLM 응답 문자열 (후처리 포함).
         """
         if not think:
-            prompt = prompt + "/no_think"
-        result = (await self._qa_chain.ainvoke(prompt)).strip()
+            prompt = f"{prompt}/no_think"
+        result = await self._qa_chain.ainvoke(prompt)
         # </think> 태그 제거: 시스템 메시지와 사용자 응답 분리 목적으로 삽입된 내용을 후처리로 제거
-        if "</think>" in result:
-            result = re.sub(r'<think>.*?</think>', '', result, flags=re.DOTALL).strip()
-        return result
+        return _THINK_RE.sub("", result).strip()
 
 
     async def summarize(self, docs: List[TextChunk]) -> str:  # noqa: D401
         """High‑level summary using map‑reduce over *docs*.
 
+        map 단계는 청크별 호출을 순차로 기다리지 않고 ``abatch``로 동시에
+        실행한다. 부분 요약이 ``_TOKEN_MAX`` 를 넘으면 예산 단위 묶음을 다시
+        ``abatch`` 로 접어, 긴 문서에서도 최종 combine 입력이 모델 컨텍스트를
+        넘지 않게 한다.
+
         Args:
             docs: TextChunk 문자열 리스트.
 
         Returns:
             요약 문자열 결과값.
         """
-        lc_docs = [Document(page_content=t) for t in docs]
-        # ``ainvoke`` returns the final summary string when
-        # ``return_intermediate_steps=False``.
-        result = await self._summ_chain.ainvoke({"input_documents": lc_docs})
+        partials = await self._abatch(MAP_PROMPT, docs)
+
+        # 부분 요약 합이 컨텍스트 예산을 넘으면 map_reduce 체인의 collapse 처럼
+        # 예산 안에 들어가는 묶음별로 combine 해 개수를 줄인다 (묶음끼리는 동시 실행).
+        lengths = [self.llm.get_num_tokens(p) for p in partials]
+        while len(partials) > 1 and sum(lengths) > _TOKEN_MAX:
+            groups = self._group_by_budget(partials, lengths)
+            if len(groups) == len(partials):
+                break  # 개별 요약이 이미 예산 이상이라 더 접을 수 없다
+            partials = await self._abatch(
+                COMBINE_PROMPT, ["\n\n".join(g) for g in groups]
+            )
+            lengths = [self.llm.get_num_tokens(p) for p in partials]
+
+        result = await self._qa_chain.ainvoke(
+            COMBINE_PROMPT.format(text="\n\n".join(partials))
+        )
+        return _THINK_RE.sub("", result).strip()
 
-        return str(result["output_text"]).strip()
+    async def _abatch(self, template: str, texts: List[str]) -> List[str]:
+        """``template`` 을 각 텍스트에 적용해 동시에 호출하고 think 태그를 제거한다."""
+        outs = await self._qa_chain.abatch(
+            [template.format(text=t) for t in texts],
+            config={"max_concurrency": _MAP_CONCURRENCY},
+        )
+        return [_THINK_RE.sub("", o).strip() for o in outs]
+
+    @staticmethod
+    def _group_by_budget(texts: List[str], lengths: List[int]) -> List[List[str]]:
+        """순서를 유지한 채 토큰 합이 ``_TOKEN_MAX`` 이하인 묶음으로 나눈다."""
+        groups: List[List[str]] = []
+        cur: List[str] = []
+        used = 0
+        for text, n in zip(texts, lengths):
+            if cur and used + n > _TOKEN_MAX:
+                groups.append(cur)
+                cur, used = [], 0
+            cur.append(text)
+            used += n
+        if cur:
+            groups.append(cur)
+        return groups
 
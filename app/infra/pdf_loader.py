@@ -2,16 +2,15 @@
 PDF URL을 읽어 텍스트 청크(list[str])로 변환하는 로더.
 
 - `PDFReceiver`가 PDF를 다운로드·텍스트/OCR 추출.
-- `RecursiveCharacterTextSplitter`로 2 000자 청크(중첩 200) 분할.
+- 공용 `PDF_SPLITTER`로 1 500자 청크(중첩 200) 분할.
 - 인프라 계층에서 PdfLoaderIF(Port)를 구현한다.
 """
 
 from typing import List
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-
 from app.domain.interfaces import PdfLoaderIF, TextChunk
 from app.infra.pdf_receiver import PDFReceiver
+from app.infra.text_splitter import PDF_SPLITTER
 
 
 class PdfLoader(PdfLoaderIF):
@@ -20,13 +19,9 @@ class PdfLoader(PdfLoaderIF):
     Attributes
     ----------
     splitter : RecursiveCharacterTextSplitter
-        1500자 청크 + 200자 오버랩 설정.
+        공용 `PDF_SPLITTER` (1500자 청크 + 200자 오버랩).
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1500,
-        chunk_overlap=200,
-        separators=["\n\n", "\n", ". ", " ", ""],   # 문단→문장→단어
-    )
+    splitter = PDF_SPLITTER
 
 
     async def load(self, url: str) -> List[TextChunk]:
@@ -1,18 +1,90 @@
 """pdf_receiver.py
 외부 PDF 링크로부터 논문을 다운로드한 뒤, 텍스트를 추출한다.
 OCR 기반 보완도 포함된 비동기 파서.
+
+PyMuPDF 는 멀티스레드 사용을 지원하지 않고 GIL 도 놓지 않으므로, 모든 fitz 작업
+(열기·텍스트 추출·렌더링·닫기)은 전용 단일 스레드(`_FITZ_EXECUTOR`)에서만 실행한다.
+병렬성은 tesseract 서브프로세스(`OCR_WORKERS`)에서 얻는다.
+
+환경 변수
+---------
+- `PDF_MAX_MB`  : 다운로드 허용 최대 PDF 크기(MB, 기본 50)
+- `OCR_WORKERS` : 동시 tesseract 프로세스 수(기본 CPU 코어 수)
+- `TESSERACT_CMD` : tesseract 실행 파일 경로(기본 `tesseract`)
+- `PDF_TEXT_CACHE_SIZE` : 추출 결과를 보관할 PDF 수(본문 sha256 기준, 기본 64).
+  OCR 이 실패한 페이지가 있는 결과는 보관하지 않는다.
+- `PDF_OCR_SKIP_NO_IMAGES` : "1" 이면 래스터 이미지가 없는 저텍스트 페이지의 OCR 을
+  건너뜀(기본 "0"). 윤곽선 글꼴·CAD/슬라이드 내보내기처럼 글자가 벡터 경로인
+  페이지는 이미지가 없어도 OCR 로만 읽히므로 기본값은 모두 OCR 한다.
 """
 
+import asyncio
+import hashlib
+import io
 import os
-import tempfile
-from typing import Final, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Final, List, Optional, Tuple, TypeVar
 
 import httpx                # ✅ async HTTP client
-from PIL import Image, ImageOps
-import pytesseract
+from PIL import Image
 import fitz                 # PyMuPDF
 
 _TIMEOUT: Final[int] = 30  # seconds
+_MAX_PDF_SIZE: Final[int] = int(os.getenv("PDF_MAX_MB", "50")) * 1024 * 1024
+_CHUNK_SIZE: Final[int] = 64 * 1024  # 다운로드 스트림 읽기 단위
+
+# 모든 다운로드가 공유하는 HTTP 클라이언트: 요청마다 TCP/TLS 핸드셰이크를
+# 다시 하지 않고 keep-alive 커넥션과 HTTP/2 멀티플렉싱을 재사용한다.
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=_TIMEOUT,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+
+_T = TypeVar("_T")
+
+# 모든 문서의 fitz 호출을 한 스레드로 직렬화한다. 스레드를 늘려도 GIL 때문에 빨라지지
+# 않고 문서 간 동시 접근만 위험해지므로, 더 늘리려면 프로세스 풀로 바꿔야 한다.
+_FITZ_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fitz")
+
+
+async def _run_fitz(fn: Callable[..., _T], *args, **kwargs) -> _T:
+    """PyMuPDF 블로킹 호출을 전용 fitz 스레드에서 실행한다."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _FITZ_EXECUTOR, partial(fn, *args, **kwargs)
+    )
+
+_OCR_DPI: Final[int] = 300
+# 렌더링 행렬은 매 페이지 새로 만들지 않고 공유한다.
+_OCR_MATRIX: Final = fitz.Matrix(_OCR_DPI / 72, _OCR_DPI / 72)
+# 이진화(임계값 180) 룩업 테이블: 페이지마다 람다로 다시 계산하지 않는다.
+_BINARIZE_LUT: Final[List[int]] = [0 if x < 180 else 255 for x in range(256)]
+_OCR_WORKERS: Final[int] = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 4)))
+_OCR_TIMEOUT: Final[int] = 10  # seconds per page
+_TESSERACT_CMD: Final[str] = os.getenv("TESSERACT_CMD", "tesseract")
+_SKIP_NO_IMAGES: Final[bool] = os.getenv("PDF_OCR_SKIP_NO_IMAGES", "0") == "1"
+
+# 모든 요청이 공유하는 OCR 동시 실행 상한. tesseract 는 asyncio 서브프로세스로
+# 실행하므로 대기 중에 스레드를 점유하지 않고, 인식은 코어마다 병렬로 진행된다.
+# 렌더링부터 인식까지 한 슬롯을 쓰므로 동시에 메모리에 있는 페이지 이미지 수도 제한된다.
+_OCR_SEM = asyncio.Semaphore(_OCR_WORKERS)
+
+# 본문 sha256 → 추출 텍스트 LRU. file_id 가 달라도 같은 PDF 면 파싱·OCR 을 건너뛴다.
+_TEXT_CACHE_SIZE: Final[int] = int(os.getenv("PDF_TEXT_CACHE_SIZE", "64"))
+_TEXT_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _hash_and_open(data: bytes) -> Tuple[str, "fitz.Document"]:
+    """본문 sha256 과 메모리에서 연 PyMuPDF 문서를 반환한다 (fitz 스레드 전용)."""
+    return hashlib.sha256(data).hexdigest(), fitz.open(stream=data, filetype="pdf")
+
+
+async def close_http_client() -> None:
+    """공유 HTTP 클라이언트를 닫는다 (앱 종료 시 호출)."""
+    await _CLIENT.aclose()
 
 
 class PDFReceiver:
@@ -30,72 +102,173 @@ class PDFReceiver:
         Returns:
             텍스트 추출 결과 문자열 (OCR 보완 포함).
         """
-        async with httpx.AsyncClient(timeout=_TIMEOUT, follow_redirects=True) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
+        data = await self._download(url)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as fp:
-            fp.write(resp.content)
-            pdf_path = fp.name
+        # PyMuPDF 파싱·렌더링은 블로킹 작업이므로 fitz 전용 스레드에서 처리해,
+        # 그동안 이벤트 루프가 다른 요청의 다운로드·LLM 호출을 진행한다.
+        # 최대 `PDF_MAX_MB` 크기의 sha256 도 루프를 막지 않도록 같은 호출에서 계산한다.
+        digest, doc = await _run_fitz(_hash_and_open, data)
+        cached = _TEXT_CACHE.get(digest)
+        if cached is not None:
+            _TEXT_CACHE.move_to_end(digest)
+            _FITZ_EXECUTOR.submit(doc.close)
+            return cached
 
+        parser = PDFParser()
         try:
-            parser = PDFParser()
-            elements: List[str] = parser.read(pdf_path)
-            return "\n".join(e for e in elements if e)
+            pages = await _run_fitz(parser.read, doc)
+
+            # OCR 이 필요한 페이지(None)는 페이지마다 렌더링 → 인식을 이어서 수행한다.
+            # 렌더링을 미리 몰아 하지 않으므로 한 페이지를 인식하는 동안 다음 페이지를
+            # 렌더링하고, 메모리에 올라가는 이미지는 `_OCR_WORKERS` 장으로 제한된다.
+            ocr_idx = [i for i, p in enumerate(pages) if p is None]
+            ocr_texts = await asyncio.gather(*(parser.ocr_page(doc, i) for i in ocr_idx))
         finally:
-            os.remove(pdf_path)
+            # 취소돼도 이미 제출된 렌더링이 같은 스레드에서 끝난 뒤에 닫히도록 큐에 넣는다.
+            _FITZ_EXECUTOR.submit(doc.close)
+        for i, text in zip(ocr_idx, ocr_texts):
+            pages[i] = text
+
+        text = "\n".join(p for p in pages if p)
+        # OCR 이 실패·시간 초과된 페이지가 있으면 일부가 빠진 결과이므로 캐시하지 않는다.
+        if _TEXT_CACHE_SIZE > 0 and all(t is not None for t in ocr_texts):
+            _TEXT_CACHE[digest] = text
+            if len(_TEXT_CACHE) > _TEXT_CACHE_SIZE:
+                _TEXT_CACHE.popitem(last=False)
+        return text
+
+    async def _download(self, url: str) -> bytearray:
+        """PDF 본문을 스트리밍으로 받아 하나의 버퍼에 모은다.
+
+        응답 전체를 `resp.content` 로 한 번 더 복사하지 않으며,
+        `_MAX_PDF_SIZE` 를 넘으면 즉시 중단한다. 응답 헤더의 `Content-Length`
+        가 이미 한도를 넘으면 본문을 받기 전에 거절한다.
+
+        Raises:
+            ValueError: PDF 크기가 `_MAX_PDF_SIZE` 초과.
+        """
+        buf = bytearray()
+        async with _CLIENT.stream("GET", url) as resp:
+            resp.raise_for_status()
+            length = resp.headers.get("Content-Length", "")
+            if length.isdigit() and int(length) > _MAX_PDF_SIZE:
+                raise ValueError("PDF too large")
+            async for chunk in resp.aiter_bytes(_CHUNK_SIZE):
+                buf += chunk
+                if len(buf) > _MAX_PDF_SIZE:
+                    raise ValueError("PDF too large")
+        return buf
 
 
 class PDFParser:
     """PDF 텍스트 파서 + OCR 보완.
 
     Attributes:
-        ocr_lang: pytesseract 언어 설정 문자열 (기본: kor+eng)
+        ocr_lang: tesseract 언어 설정 문자열 (기본: kor+eng)
     """
 
     def __init__(self, ocr_lang: str = "kor+eng"):
         self.ocr_lang = ocr_lang
 
-    def read(self, pdf_path: str) -> List[str]:
-        """PDF 전체 페이지에서 텍스트를 추출한다.
+    def read(self, doc: "fitz.Document") -> List[Optional[str]]:
+        """PDF 전체 페이지에서 텍스트를 추출한다 (동기).
+
+        각 페이지에 대해 기본 텍스트 추출을 시도하고, 텍스트가 부족한 페이지는
+        None 으로 표시해 둔다(`PDF_OCR_SKIP_NO_IMAGES` 사용 시 래스터 이미지가 있는
+        페이지만). 렌더링과 인식은
+        `ocr_page` 에서 페이지 단위로 수행한다.
+
+        Args:
+            doc: 메모리에서 연 PyMuPDF 문서 (임시 파일 없음).
+
+        Returns:
+            페이지별 텍스트, 또는 OCR 이 필요한 페이지의 None.
+        """
+        pages: List[Optional[str]] = []
+        for page in doc:
+            text = page.get_text("text")
+            # 텍스트 레이어가 충분한 페이지는 렌더링하지 않는다. 옵션을 켜면 래스터
+            # 이미지가 없는 페이지(벡터 글자 페이지는 놓칠 수 있음)도 건너뛴다.
+            if len(text.strip()) > 50 or (_SKIP_NO_IMAGES and not page.get_images()):
+                pages.append(text)
+            else:
+                pages.append(None)
+        return pages
 
-        각 페이지에 대해 기본 텍스트 추출을 시도하고,
-        텍스트가 부족한 경우 OCR을 자동 수행한다.
+    async def ocr_page(self, doc: "fitz.Document", page_no: int) -> Optional[str]:
+        """한 페이지를 렌더링한 뒤 곧바로 tesseract 로 인식한다.
+
+        `_OCR_SEM` 을 렌더링부터 인식까지 잡고 있어, 모든 요청을 합쳐 동시에
+        메모리에 있는 페이지 이미지는 `_OCR_WORKERS` 장을 넘지 않는다.
 
         Args:
-            pdf_path: 로컬 PDF 파일 경로.
+            doc: `read` 에 쓴 PyMuPDF 문서 (인식이 끝날 때까지 열려 있어야 함).
+            page_no: 0부터 시작하는 페이지 번호.
 
         Returns:
-            페이지별 텍스트 목록.
+            OCR 추출 문자열. 렌더링·인식 실패 시 None 반환.
         """
-        with fitz.open(pdf_path) as doc:
-            texts = []
-            for page in doc:
-                text = page.get_text("text")
-                if len(text.strip()) > 50:
-                    texts.append(text)
-                else:
-                    texts.append(self._ocr_page(page))
-        return texts
+        async with _OCR_SEM:
+            img = await _run_fitz(lambda: self._render_page(doc[page_no]))
+            if img is None:
+                return None
+            return await self.ocr(img)
+
+    async def ocr(self, img: bytes) -> Optional[str]:
+        """tesseract 서브프로세스로 이미지의 텍스트를 인식한다.
+
+        시간 초과나 호출 태스크 취소 시에도 프로세스를 종료해 고아로 남기지 않는다.
+
+        Args:
+            img: `_render_page` 가 렌더링한 PBM 이미지 bytes.
+
+        Returns:
+            OCR 추출 문자열(글자가 없으면 빈 문자열). 실패·시간 초과 시 None 반환.
+        """
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                _TESSERACT_CMD, "stdin", "stdout", "-l", self.ocr_lang,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(img), _OCR_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if proc.returncode is None:  # 시간 초과·CancelledError 로 빠져나온 경우
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+        if proc.returncode != 0:
+            return None
+        return out.decode("utf-8", errors="ignore")
 
     # ───────────────────── 내부 OCR 헬퍼 ─────────────────────
-    def _ocr_page(self, page, dpi: int = 300) -> str:
-        """OCR을 통해 텍스트를 추출한다 (페이지 렌더링 기반).
+    def _render_page(self, page) -> Optional[bytes]:
+        """페이지를 렌더링해 이진화된 PBM 이미지 bytes로 반환한다.
 
-        페이지를 이미지로 렌더링한 뒤 grayscale + 이진화 처리 후 pytesseract로 텍스트 인식.
+        `_OCR_DPI` 해상도로 알파 채널 없이 곧바로 grayscale 렌더링해, RGB 렌더 후
+        다시 흑백으로 변환하는 복사를 생략한다. 1-bit PBM 은 인코딩 비용이 거의
+        없고 tesseract 가 stdin 으로 바로 읽는다. PyMuPDF 는 스레드 안전하지 않으므로
+        반드시 `_run_fitz` 를 통해 fitz 전용 스레드에서 호출한다.
 
         Args:
             page: PyMuPDF 페이지 객체.
-            dpi: 렌더링 해상도 (기본 300).
 
         Returns:
-            OCR 추출 문자열. 실패 시 빈 문자열 반환.
+            PBM 이미지 bytes. 실패 시 None.
         """
         try:
-            pix = page.get_pixmap(dpi=dpi)
-            img = pix.pil_image
-            gray = ImageOps.grayscale(img)
-            bw = gray.point(lambda x: 0 if x < 180 else 255, "1")
-            return pytesseract.image_to_string(bw, lang=self.ocr_lang, timeout=10)
+            pix = page.get_pixmap(matrix=_OCR_MATRIX, colorspace=fitz.csGRAY, alpha=False)
+            gray = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            buf = io.BytesIO()
+            gray.point(_BINARIZE_LUT, "1").save(buf, format="PPM")
+            return buf.getvalue()
         except Exception:
-            return ""
+            return None
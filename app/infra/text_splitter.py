@@ -0,0 +1,29 @@
+# app/infra/text_splitter.py
+"""text_splitter.py
+로더·검색·벡터 DB 가 공유하는 `RecursiveCharacterTextSplitter` 싱글턴 모음.
+
+splitter 는 생성 시 구분자 정규식을 준비하므로, 호출마다 만들지 않고 모듈
+로드 시 한 번만 생성해 재사용한다.
+"""
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# PDF 본문: 1500자 청크 + 200자 오버랩, 문단→문장→단어 순으로 분할
+PDF_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=1500,
+    chunk_overlap=200,
+    separators=["\n\n", "\n", ". ", " ", ""],
+)
+
+# 웹 검색 결과: 항목별 2000자 청크 + 200자 오버랩
+WEB_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=2000,
+    chunk_overlap=200,
+)
+
+# VectorDB.store 에 원문 문자열이 들어온 경우: 3000자 청크 + 300자 오버랩
+VECTOR_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=3000,
+    chunk_overlap=300,
+    length_function=len,
+)
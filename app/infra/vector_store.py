@@ -4,11 +4,36 @@ LangChain‑Chroma 기반 벡터 스토어 어댑터.
 
 문서 청크를 upsert·검색하는 역할만 담당하며, 상위 서비스는 **VectorStoreIF**만
 의존하므로 다른 DB(Pinecone 등)로 교체하기 쉽다.
+
+`VectorDB` 의 Chroma·임베딩 호출은 블로킹 HTTP 이므로 전용 스레드 풀에서 실행해,
+그래프 노드의 `asyncio.gather`(웹 검색 + 벡터 검색 등)가 실제로 겹쳐 진행되게 한다.
+
+환경 변수
+---------
+- `CHROMA_WORKERS` : Chroma 호출 전용 스레드 수(기본 16)
 """
-from typing import List
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, TypeVar
+
 from app.domain.interfaces import VectorStoreIF, TextChunk
 from app.vectordb.vector_db import get_vector_db
 
+_T = TypeVar("_T")
+
+# 기본 executor 의 다른 블로킹 작업과 경합하지 않도록 분리한 풀
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHROMA_WORKERS", "16")),
+    thread_name_prefix="chroma",
+)
+
+
+async def _run(fn: Callable[..., _T], *args) -> _T:
+    """블로킹 VectorDB 메서드를 전용 스레드 풀에서 실행한다."""
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, partial(fn, *args))
+
 
 class VectorStore(VectorStoreIF):
     """VectorStoreIF 구현체.
@@ -24,20 +49,20 @@ class VectorStore(VectorStoreIF):
 
     async def upsert(self, chunks: List[TextChunk], doc_id: str) -> None:
         """텍스트 청크를 벡터 DB에 저장한다."""
-        self.vdb.store(chunks, doc_id)
+        await _run(self.vdb.store, chunks, doc_id)
 
     async def similarity_search(
         self, doc_id: str, query: str, k: int = 8
     ) -> List[TextChunk]:
         """벡터 유사도 검색 결과를 반환한다."""
-        docs = self.vdb.get_docs(doc_id, query, k)
+        docs = await _run(self.vdb.get_docs, doc_id, query, k)
         return [d.page_content for d in docs]
 
-    async def has_chunks(self, doc_id: str) -> bool:
-        """해당 문서에 저장된 청크가 존재하는지 확인한다."""
-        return self.vdb.has_chunks(doc_id)
+    async def has_chunks(self, doc_id: str) -> Optional[bool]:
+        """해당 문서에 저장된 청크가 존재하는지 확인한다. 확인할 수 없으면 None."""
+        return await _run(self.vdb.has_chunks, doc_id)
     
     async def get_all(self, doc_id: str) -> List[TextChunk]:
         """문서의 모든 청크를 plain string 형태로 반환한다."""
-        docs = self.vdb.get_all_chunks(doc_id)
+        docs = await _run(self.vdb.get_all_chunks, doc_id)
         return [d.page_content for d in docs]
@@ -9,7 +9,7 @@ from langchain_community.tools.tavily_search.tool import TavilySearchResults
 from app.domain.interfaces import WebSearchIF, TextChunk
 import os
 from typing import List
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.infra.text_splitter import WEB_SPLITTER
 
 
 class WebSearch(WebSearchIF):
@@ -30,14 +30,9 @@ class WebSearch(WebSearchIF):
             tavily_api_key=os.getenv("TAVILY_API_KEY"),
             max_results=k
         )
-        result = web_search_tool.run(query)
+        # 비동기 호출: 벡터 검색과 gather 로 묶였을 때 이벤트 루프를 막지 않는다.
+        result = await web_search_tool.arun(query)
         
-        # 검색 결과 각 항목을 개별적으로 분할
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=200
-        )
-
         chunks: List[TextChunk] = []
 
         for item in result:
@@ -46,10 +41,7 @@ class WebSearch(WebSearchIF):
 
             content = item["content"]
 
-            # 각 검색 결과에 대해 개별적으로 청크 분할
-            docs = splitter.create_documents([content])
-
-            # 텍스트만 추출하여 리스트에 추가
-            chunks.extend(doc.page_content for doc in docs)
+            # 각 검색 결과에 대해 개별적으로 청크 분할 (공용 splitter 재사용)
+            chunks.extend(WEB_SPLITTER.split_text(content))
         print(chunks)
         return chunks
\ No newline at end of file
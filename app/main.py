@@ -1,6 +1,10 @@
 
 # app/main.py
 import asyncio
+import logging
+import logging.handlers
+import queue
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.controller import (
@@ -8,9 +12,36 @@ from app.controller import (
     chat_summary_controller,
     feedback_controller,
 )
-print("[DEBUG] main.py 시작됨", flush=True)
+from app.infra.pdf_receiver import close_http_client
 
-app = FastAPI(title="Multi-Summary API")
+# ───────────────────────────────────────────
+# Logging: 핸들러 I/O 는 별도 스레드(QueueListener)에서 처리해
+# 이벤트 루프가 stdout flush 에 묶이지 않도록 한다.
+# ───────────────────────────────────────────
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("[%(levelname)s] %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+
+_root = logging.getLogger()
+_root.setLevel(logging.INFO)
+_root.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+log = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    _log_listener.start()
+    log.info("main.py 시작됨")
+    try:
+        yield
+    finally:
+        await close_http_client()
+        _log_listener.stop()
+
+
+app = FastAPI(title="Multi-Summary API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
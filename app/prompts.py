@@ -2,16 +2,34 @@
 """prompts.py
 LLM 파이프라인에서 사용하는 주요 프롬프트 템플릿 정의 모듈.
 
-Jinja2 템플릿을 사용하며, 웹 여부 판단 / 정보 평가 / 응답 생성 / 검증 /
-리파인 / 번역 등 LangGraph 노드별 작업에 대응하는 프롬프트를 제공한다.
+웹 여부 판단 / 정보 평가 / 응답 생성 / 검증 / 리파인 / 번역 등 LangGraph
+노드별 작업에 대응하는 프롬프트를 제공한다. 모든 템플릿은 단순 치환만 하므로
+Jinja2 대신 `str.format(**ctx)` 로 렌더링한다.
+
+변수 배치 순서: 고정 지시문 → 문서 단위로 고정된 값(summary) → 질의 단위 값
+(query) → 호출마다 바뀌는 값(chunk, answer 등). 같은 문서에 대한 호출끼리
+프롬프트 앞부분이 바이트 단위로 같아져 LLM 서버의 prefix(KV) 캐시가 재사용된다.
 """
 
-from jinja2 import Template
+from typing import Callable
+
+
+def partial_prompt(template: str, field: str, **ctx: object) -> Callable[[str], str]:
+    """`field` 를 제외한 변수를 한 번만 치환해 두고, `field` 값만 끼워 넣는 함수를 반환한다.
+
+    같은 질의·요약으로 여러 청크를 평가할 때 고정부를 매번 다시 포맷하지 않는다.
+    템플릿에 `{field}` 가 정확히 한 번 있어야 한다.
+    """
+    head, sep, tail = template.partition("{" + field + "}")
+    if not sep:
+        raise KeyError(field)
+    head, tail = head.format(**ctx), tail.format(**ctx)
+    return lambda value: f"{head}{value}{tail}"
 
 # ─────────────────────────────────────────────────────────────
 # 1. 웹 정보 필요 여부 판단 (RAG_router)
 # ─────────────────────────────────────────────────────────────
-PROMPT_DETERMINE_WEB = Template("""
+PROMPT_DETERMINE_WEB = """
 You are an intelligent assistant tasked with determining whether the given query requires additional, up-to-date, or broader information from the web, beyond what has been retrieved from a local database (vectorDB).
 
 Consider the following:
@@ -22,15 +40,15 @@ Consider the following:
 
 You may only respond with a single word: either `true` or `false`.
 
-Query: {{ query }}
-Retrieved Summary: {{ summary }}
-""")
+Retrieved Summary: {summary}
+Query: {query}
+"""
 
 
 # ─────────────────────────────────────────────────────────────
 # 2. 검색 조각(chunks) 유효성 점수 (grade)
 # ─────────────────────────────────────────────────────────────
-PROMPT_GRADE = Template("""
+PROMPT_GRADE = """
 You are a relevance grader evaluating whether a retrieved document chunk is topically and semantically related to a user question.
 
 Instructions:
@@ -42,27 +60,45 @@ Instructions:
 
 You MUST return only one word: 'yes' or 'no'. Do not include any explanation.
 
-Query: {{ query }}
-Retrieved Chunk: {{ chunk }}
-Vector Summary (Optional): {{ summary }}
-""")
+Vector Summary (Optional): {summary}
+Query: {query}
+Retrieved Chunk: {chunk}
+"""
+
+
+# 여러 청크를 한 번의 호출로 평가 (grade, 파싱 실패 시 PROMPT_GRADE 로 폴백)
+PROMPT_GRADE_BATCH = """
+You are a relevance grader evaluating whether each retrieved document chunk is topically and semantically related to a user question.
 
+Instructions:
+- For each chunk, determine if it is genuinely helpful in answering the query, based on topic, semantics, and context.
+- Surface-level keyword overlap is not enough — the chunk must provide meaningful or contextually appropriate information related to the query.
+- However, minor differences in phrasing or partial answers are acceptable as long as the chunk is on-topic.
+- Mark a chunk 'no' if it is off-topic, unrelated, or misleading, and 'yes' if it is relevant and contextually appropriate.
+
+You MUST return only a JSON array with one 'yes' or 'no' per chunk, in chunk order (e.g. ["yes", "no"]). Do not include any explanation.
+
+Vector Summary (Optional): {summary}
+Query: {query}
+Retrieved Chunks ({count}):
+{chunks}
+"""
 
 # ─────────────────────────────────────────────────────────────
 # 3. 최종 답변 생성 (generate)
 # ─────────────────────────────────────────────────────────────
-PROMPT_GENERATE = Template("""
+PROMPT_GENERATE = """
 You are a helpful assistant that can generate a answer of the query in English.
 Use the retrieved information to generate the answer.
 YOU MUST RETURN ONLY THE ANSWER, NOTHING ELSE.
-Query: {{ query }}
-Retrieved: {{ retrieved }}
-""")
+Query: {query}
+Retrieved: {retrieved}
+"""
 
 # ─────────────────────────────────────────────────────────────
 # 4. 답변 품질 검증 (verify)
 # ─────────────────────────────────────────────────────────────
-PROMPT_VERIFY = Template("""
+PROMPT_VERIFY = """
 You are a helpful assistant that can verify the quality of the generated answer.
 Please evaluate the answer based on the following five criteria:
 
@@ -77,35 +113,35 @@ Notes:
 - If the answer does not reference or rely on the retrieved content in a meaningful way, mark it as bad.
 - Do not infer user intent beyond the given query and content.
 
-Query: {{ query }}
-Summary: {{ summary }}
-Retrieved Information: {{ retrieved }}
-Generated Answer: {{ answer }}
+Summary: {summary}
+Query: {query}
+Retrieved Information: {retrieved}
+Generated Answer: {answer}
 
 Return only one word: good or bad.
-""")
+"""
 
 # ─────────────────────────────────────────────────────────────
 # 5. 쿼리 리파인 또는 사과문 (refine)
 # ─────────────────────────────────────────────────────────────
-PROMPT_REFINE = Template("""
+PROMPT_REFINE = """
 You are a helpful assistant that can do two things:
 1. If the query is not related to the document summary, return ONLY this sentence: "I'm sorry, I can't find the answer to your question even though I read all the documents. Please ask a question about the document's content."
 2. If the query is related, refine the query to get more relevant and accurate information based on the document summary and retrieved information. Return ONLY the refined query, nothing else.
 
-Document Summary: {{ summary }}
-Original Query: {{ query }}
-Retrieved Information: {{ retrieved }}
-Generated Answer: {{ answer }}
-""")
+Document Summary: {summary}
+Original Query: {query}
+Retrieved Information: {retrieved}
+Generated Answer: {answer}
+"""
 
 # ─────────────────────────────────────────────────────────────
 # 6. 번역 (translate)
 # ─────────────────────────────────────────────────────────────
-PROMPT_TRANSLATE = Template("""
+PROMPT_TRANSLATE = """
 You are a helpful assistant that can translate the answer to User language.
 EN is English, KR is Korean.
 ONLY RETURN THE TRANSLATED SEQUENCE, NOTHING ELSE.
-User language: {{ lang }}
-Answer: {{ text }}
-""")
\ No newline at end of file
+User language: {lang}
+Answer: {text}
+"""
\ No newline at end of file
@@ -11,15 +11,22 @@
 
 from __future__ import annotations
 import asyncio
+import json
+import re
+from dataclasses import dataclass, field
 from functools import wraps
-from typing import List, Optional, Awaitable, Callable
+from typing import List, Optional, Awaitable, Callable, Tuple
 from langgraph.graph import StateGraph
-from pydantic import BaseModel
 from app.domain.interfaces import LlmChainIF, TextChunk
 
 # ────────────────────────── 상태 모델 ────────────────────────────
-class ChatState(BaseModel):
-    """그래프 실행 중 사용되는 공유 상태."""
+@dataclass(slots=True)
+class ChatState:
+    """그래프 실행 중 사용되는 공유 상태.
+
+    내부 상태라 필드 검증이 필요 없으므로 Pydantic 대신 slots dataclass 를 쓴다.
+    입력 검증은 FastAPI 경계의 DTO 가 담당한다.
+    """
 
     messages: List[str]
     query: str
@@ -29,27 +36,91 @@ class ChatState(BaseModel):
     answer:  Optional[str] = None
     is_summary: bool = False
     error: Optional[str] = None
-    log: List[str] = []
+    log: List[str] = field(default_factory=list)
     
     need_refine: bool = False
+    refine_count: int = 0
+    messages_joined: str = ""
 
 # ────────────────────────── 공통 설정 ────────────────────────────
-_RETRY, _SLEEP = 3, 1
+_RETRY, _SLEEP = 3, 1  # 첫 재시도 대기(초), 이후 2배씩 증가
+_MAX_REFINE = 3        # verify_or_refine 리파인 최대 횟수
+
+# ────────────────────────── 프롬프트 ──────────────────────────────
+_ANSWER_PROMPT = (
+    "You are a helpful assistant. Using the following chat history, "
+    "### Question:\n{query}\n\n"
+    "### Chat history:\n{docs}\n\n"
+    "### Answer:"
+)
+
+_VERIFY_OR_REFINE_PROMPT = (
+    "You are a helpful assistant that verifies if an answer is relevant to the chat history "
+    "and fixes it when needed.\n\n"
+    "Rules:\n"
+    "- If the answer is correct and clearly based on the chat history, "
+    "output {{\"verdict\": \"true\"}}\n"
+    "- If the answer is unrelated to the chat history, output {{\"verdict\": \"bad\"}}\n"
+    "- If the answer is partially incorrect or irrelevant, refine it using the chat history and "
+    "output {{\"verdict\": \"refine\", \"answer\": \"<refined answer>\"}}\n"
+    "- ONLY return the JSON object.\n\n"
+    "### Question:\n{query}\n\n"
+    "### Chat History:\n{docs}\n\n"
+    "### Answer:\n{answer}\n\n"
+    "### Verify:"
+)
+
+_TRANSLATE_PROMPT = (
+    "You are a professional translator.\n"
+    "Translate the following text **into {lang}**."
+    "Preserve meaning and tone:\n\n"
+    "{text}"
+)
+
+# verify_or_refine 응답에서 JSON 객체 / verdict 값을 찾는 패턴
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+_VERDICT_RE = re.compile(r"\b(true|bad|refine|false)\b", re.IGNORECASE)
+
+
+def _parse_verdict(text: str) -> Tuple[str, Optional[str]]:
+    """verify_or_refine 응답을 (verdict, 리파인 답변) 으로 해석한다.
+
+    JSON 파싱에 실패하면 키워드로 verdict 만 추정하며, 이 경우 리파인 답변은 없다.
+    """
+    m = _JSON_RE.search(text)
+    if m:
+        try:
+            data = json.loads(m.group(0))
+            verdict = str(data.get("verdict", "")).lower()
+            answer = data.get("answer")
+            return verdict, answer if isinstance(answer, str) and answer.strip() else None
+        except (ValueError, AttributeError):
+            pass
+    m = _VERDICT_RE.search(text)
+    verdict = m.group(1).lower() if m else "true"
+    return ("refine" if verdict == "false" else verdict), None
 
 # ────────────────────────── 재시도 데코레이터 ───────────────────
 def safe_retry(fn: Callable[[ChatState], Awaitable[ChatState]]):
-    """노드 함수가 예외를 던질 때 최대 3회까지 재시도한다."""
+    """노드 함수가 예외를 던질 때 최대 3회까지 재시도한다.
+
+    노드 이름과 시도별 로그 문자열은 데코레이션 시 한 번만 만들고,
+    재시도 간격은 `_SLEEP` 에서 시작해 지수적으로 늘린다.
+    """
+    name = fn.__name__
+    tags = [f"{name}:{i}" for i in range(1, _RETRY + 1)]
+
     @wraps(fn)
     async def _wrap(st: ChatState):
-        for i in range(1, _RETRY + 1):
+        for i, tag in enumerate(tags):
+            st.log.append(tag)
             try:
-                st.log.append(f"{fn.__name__}:{i}")
                 return await fn(st)
             except Exception as e:
-                if i == _RETRY:
-                    st.error = f"{fn.__name__} failed: {e}"
+                if i == _RETRY - 1:
+                    st.error = f"{name} failed: {e}"
                     return st
-                await asyncio.sleep(_SLEEP)
+                await asyncio.sleep(_SLEEP * (2 ** i))
     return _wrap
 
 # ────────────────────────── 그래프 빌더 ───────────────────────────
@@ -63,6 +134,8 @@ class ChatGraphBuilder:
         # entry --------------------------------------------------------
         async def entry(st: ChatState):
             st.is_summary = st.query.strip().upper() == "SUMMARY_ALL"
+            # answer / verify_or_refine 가 매번 다시 join 하지 않도록 한 번만 만든다.
+            st.messages_joined = "\n".join(st.messages)
             return st
         g.add_node("entry", entry)
 
@@ -76,91 +149,55 @@ class ChatGraphBuilder:
         # answer -------------------------------------------------------
         @safe_retry
         async def answer(st: ChatState):
-            docs = "\n".join(st.messages)
-            prompt = (
-                "You are a helpful assistant. Using the following chat history, "
-                "### Question:\n{query}\n\n"
-                "### Chat history:\n{docs}\n\n"
-                "### Answer:"
-            ).format(query=st.query, docs=docs)
+            prompt = _ANSWER_PROMPT.format(query=st.query, docs=st.messages_joined)
 
             st.answer = await self.llm.execute(prompt)
             return st
         g.add_node("answer", answer)
         
-        # verify -------------------------------------------------------
+        # verify_or_refine ---------------------------------------------
         @safe_retry
-        async def verify(st: ChatState):
-            prompt = (
-            "You are a helpful assistant that verifies if an answer is relevant to the chat history.\n\n"
-            "Rules:\n"
-            "- If the answer is unrelated to the chat history, return 'bad'\n"
-            "- If the answer is partially incorrect or irrelevant, return 'false'\n"
-            "- If the answer is correct and clearly based on the chat history, return 'true'\n"
-            "- ONLY return one of: 'true', 'false', 'bad'\n\n"
-            "### Question:\n{query}\n\n"
-            "### Chat History:\n{docs}\n\n"
-            "### Answer:\n{answer}\n\n"
-            "### Verify:"
-            ).format(query=st.query, docs="\n".join(st.messages), answer=st.answer)
-
-            answer = await self.llm.execute(prompt)
-            st.log.append(f"answer: {answer}")
-            if "bad" in answer.lower():
+        async def verify_or_refine(st: ChatState):
+            """답변을 검증하고, 필요하면 같은 호출에서 리파인 답변까지 받는다.
+
+            검증·리파인을 한 프롬프트로 합쳐 수정 경로의 LLM 호출을 반으로 줄인다.
+            리파인은 `_MAX_REFINE` 회까지 반복하며, 리파인된 답변은 다음 호출에서
+            다시 검증된다.
+            """
+            prompt = _VERIFY_OR_REFINE_PROMPT.format(
+                query=st.query, docs=st.messages_joined, answer=st.answer
+            )
+
+            result = await self.llm.execute(prompt)
+            st.log.append(f"answer: {result}")
+            verdict, refined = _parse_verdict(result)
+
+            st.need_refine = False
+            if verdict == "bad":
                 st.answer = (
                     "I'm sorry, I don't know the answer to that question"
                     "because it's not related to the chat history. Please try again."
                 )
-                return st
-            if "true" in answer.lower():
-                st.need_refine = False
-            else:
-                st.need_refine = True
+            elif verdict == "refine" and refined:
+                st.answer = refined
+                st.refine_count += 1
+                st.need_refine = st.refine_count < _MAX_REFINE
             return st
-        g.add_node("verify", verify)
+        g.add_node("verify_or_refine", verify_or_refine)
 
         def post_verify(st: ChatState) -> str:
             if st.error:
                 return "finish"
-            return "refine" if st.need_refine else "translate"
-        
-        g.add_conditional_edges("verify", post_verify, {
-            "refine": "refine", "translate": "translate", "finish": "finish"})
-
-        # refine -------------------------------------------------------
-        @safe_retry
-        async def refine(st: ChatState):
-            docs = "\n".join(st.messages)
-            prompt = (
-                "You are a helpful assistant. Using the following chat history, refine the answer."
-                "### Question:\n{query}\n\n"
-                "### Chat history:\n{docs}\n\n"
-                "### Answer:\n{answer}\n\n"
-                "### Refine:"
-            ).format(query=st.query, docs=docs, answer=st.answer)
-
-            st.answer = await self.llm.execute(prompt)
-            return st
-        g.add_node("refine", refine)
-        
-        def post_refine(st: ChatState) -> str:
-            if st.error:
-                return "finish"
-            return "verify"
+            return "verify_or_refine" if st.need_refine else "translate"
         
-        g.add_conditional_edges("refine", post_refine, {
-            "verify": "verify", "finish": "finish"})
+        g.add_conditional_edges("verify_or_refine", post_verify, {
+            "verify_or_refine": "verify_or_refine", "translate": "translate", "finish": "finish"})
 
         # translate ----------------------------------------------------
         async def translate(st: ChatState):
             text = st.summary if st.is_summary else st.answer
 
-            prompt = (
-            "You are a professional translator.\n"
-            "Translate the following text **into {lang}**."
-            "Preserve meaning and tone:\n\n"
-            "{text}"
-            ).format(lang=st.lang, text=text)
+            prompt = _TRANSLATE_PROMPT.format(lang=st.lang, text=text)
 
             translated = await self.llm.execute(prompt)
 
@@ -183,7 +220,7 @@ class ChatGraphBuilder:
             {"summarize": "summarize", "answer": "answer"},
         )
         g.add_edge("summarize", "translate")
-        g.add_edge("answer", "verify")
+        g.add_edge("answer", "verify_or_refine")
         g.add_edge("translate", "finish")
 
         g.set_finish_point("finish")
@@ -8,19 +8,26 @@ from __future__ import annotations
 
 import time
 import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+from dataclasses import dataclass, field
 from functools import wraps
-from typing import Awaitable, Callable, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
 from langgraph.graph import StateGraph
-from pydantic import BaseModel, Field 
 
 from app.prompts import (
     PROMPT_DETERMINE_WEB,
     PROMPT_GRADE,
+    PROMPT_GRADE_BATCH,
     PROMPT_GENERATE,
     PROMPT_VERIFY,
     PROMPT_REFINE,
     PROMPT_TRANSLATE,
+    partial_prompt,
 )
 
 from app.domain.interfaces import (
@@ -32,10 +39,15 @@ from app.domain.interfaces import (
     VectorStoreIF,
 )
 
+log = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Shared state
 # ---------------------------------------------------------------------------
-class SummaryState(BaseModel):
+@dataclass(slots=True)
+class SummaryState:
+    """요약 그래프 내부 공유 상태 (검증이 필요 없어 slots dataclass 사용)."""
+
     file_id: str
     url: str
     query: str
@@ -46,7 +58,7 @@ class SummaryState(BaseModel):
     summary: Optional[str] = None
     answer:  Optional[str] = None
     
-    log: List[str] = Field(default_factory=list)
+    log: List[str] = field(default_factory=list)
 
     cached: bool = False
     embedded: bool = False
@@ -62,13 +74,89 @@ class SummaryState(BaseModel):
 # Helper: safe-retry decorator
 # ---------------------------------------------------------------------------
 _RETRY = 3
-_SLEEP = 1  # seconds between retries
+_SLEEP = 1        # 첫 재시도 기본 대기(초), 이후 2배씩 증가 (±50% jitter)
+_MAX_SLEEP = 30   # 재시도 대기 상한(초)
+
+# 다시 시도해도 결과가 같은 입력·상태 오류는 재시도하지 않는다.
+_NON_RETRYABLE = (ValueError, TypeError, KeyError, AttributeError)
+
+# grade 노드의 청크별 LLM 동시 호출 상한 (모든 요청 공유)
+_GRADE_CONCURRENCY = 8
+_GRADE_SEM = asyncio.Semaphore(_GRADE_CONCURRENCY)
+
+# grade 노드(청크별 폴백 전용): 검색 순위 상위부터 관련 청크를 이만큼 찾으면 남은
+# 판정 호출을 취소한다. 판정은 동시에 돌지만 결과는 순위 순으로 확인하므로, LLM 지연과
+# 무관하게 항상 "yes 를 받은 상위 N 개" 가 선택된다.
+_GRADE_TOP_N = 4
+
+# 문서에서 답을 찾지 못했을 때의 고정 응답 (post_grade 가 이 값으로 분기한다)
+_NO_ANSWER = "I'm sorry, I can't find the answer to your question even though I read all the documents. Please ask a question about the document's content."
+
+# 일괄 grade 응답에서 JSON 배열을 디코딩하는 파서 (뒤에서부터 `[` 위치마다 시도)
+_JSON_DECODER = json.JSONDecoder()
+
+# 판정 프롬프트 캐시 키 계산 전 공백 정규화용
+_WS_RE = re.compile(r"\s+")
+
+
+def _one_word(*words: str) -> Callable[[str], bool]:
+    """응답이 판정 단어(예: yes/no) 하나뿐인지 검사하는 `_judge` validator.
+
+    부분 문자열로 보면 "no" 가 "not"·"cannot" 에도 걸려 거절·장황한 설명까지
+    캐시되므로, 앞뒤 구두점·따옴표만 허용하고 단어 전체가 일치해야 한다.
+    """
+    pattern = re.compile(rf"\W*(?:{'|'.join(words)})\W*", re.IGNORECASE)
+    return lambda result: pattern.fullmatch(result.strip()) is not None
+
+
+def _parse_verdicts(result: str, count: int) -> Optional[list]:
+    """일괄 grade 응답에서 길이 `count` 의 판정 배열을 꺼낸다. 해석할 수 없으면 None.
+
+    프롬프트가 청크를 `[0] …` 로 표기하므로 응답 본문에도 `[0]` 같은 괄호가 섞일 수
+    있다. 처음 `[` 부터 마지막 `]` 까지 한 덩어리로 보지 않고, 마지막 `[` 부터 거슬러
+    올라가며 그 위치에서 시작하는 JSON 배열을 디코딩해 길이가 맞는 첫 배열을 쓴다.
+    """
+    pos = len(result)
+    while (pos := result.rfind("[", 0, pos)) != -1:
+        try:
+            verdicts, _ = _JSON_DECODER.raw_decode(result, pos)
+        except ValueError:
+            continue
+        if isinstance(verdicts, list) and len(verdicts) == count:
+            return verdicts
+    return None
+
+
+def _retry_delay(exc: Exception, attempt: int) -> Optional[float]:
+    """`attempt` 번째 실패 후 대기할 시간(초). 재시도하면 안 되는 오류면 None.
+
+    HTTP 응답을 가진 예외(httpx·openai 상태 오류)는 429·408 외의 4xx 를 영구 오류로
+    보고, 429·503 의 `Retry-After`(초) 가 있으면 그만큼은 기다린다.
+    """
+    if isinstance(exc, _NON_RETRYABLE):
+        return None
+
+    delay = min(_MAX_SLEEP, _SLEEP * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    resp = getattr(exc, "response", None)
+    status = getattr(resp, "status_code", None)
+    if isinstance(status, int):
+        if 400 <= status < 500 and status not in (408, 429):
+            return None
+        if status in (429, 503):
+            try:
+                retry_after = float(resp.headers.get("Retry-After", ""))
+                delay = max(delay, min(retry_after, _MAX_SLEEP))
+            except (AttributeError, ValueError):
+                pass
+    return delay
 
 
 def safe_retry(fn: Callable[[SummaryState], Awaitable[SummaryState]]):
     """LangGraph 노드에 재시도 로직을 적용하는 데코레이터.
 
     `_RETRY` 횟수만큼 재시도하며 마지막 실패 시 상태 객체에 에러를 기록한다.
+    재시도 간격과 재시도 여부는 `_retry_delay` 가 정한다.
 
     Args:
         fn: SummaryState를 받아 비동기로 처리하는 함수이자 노드.
@@ -88,15 +176,149 @@ def safe_retry(fn: Callable[[SummaryState], Awaitable[SummaryState]]):
                 )
                 return result
             except Exception as exc:  # noqa: BLE001
-                if attempt == _RETRY:
-                    st.error = f"{fn.__name__} failed after {_RETRY} tries: {exc}"
+                delay = _retry_delay(exc, attempt)
+                if delay is None or attempt == _RETRY:
+                    st.error = f"{fn.__name__} failed after {attempt} tries: {exc}"
                     return st
-                await asyncio.sleep(_SLEEP)
+                await asyncio.sleep(delay)
         return st  # nothing should reach here
 
     return _wrap
 
 
+# ---------------------------------------------------------------------------
+# Routing: 상태만 보고 다음 노드를 고르는 분기 함수와 경로 맵.
+# self 에 의존하지 않으므로 build() 마다 다시 만들지 않고 모듈 수준에 둔다.
+# ---------------------------------------------------------------------------
+def entry_branch(st: SummaryState) -> str:
+    if st.error:
+        return "finish"
+    if st.is_summary:
+        if st.cached:
+            return "translate"
+        return "RAG_router" if st.embedded else "load"
+    return "RAG_router" if st.embedded else "load"
+
+
+def post_load(st: SummaryState) -> str:
+    return "finish" if st.error else "embed"
+
+
+def post_embed(st: SummaryState) -> str:
+    return "finish" if st.error else "RAG_router"
+
+
+def post_RAG_router(st: SummaryState) -> str:
+    if st.error:
+        return "finish"
+    if st.is_summary:
+        return "summarize"
+    return "retrieve_web" if st.is_web else "retrieve_vector"
+
+
+def post_retrieve_web(st: SummaryState) -> str:
+    if st.error:
+        return "finish"
+    else:
+        return "grade"
+
+
+def post_retrieve_vector(st: SummaryState) -> str:
+    if st.error:
+        return "finish"
+    else:
+        return "grade"
+
+
+def post_grade(st: SummaryState) -> str:
+    if st.answer == _NO_ANSWER:
+        return "translate"
+    if st.error:
+        return "finish"
+    else:
+        return "generate"
+
+
+def post_generate(st: SummaryState) -> str:
+    return "finish" if st.error else "verify"
+
+
+def post_verify(st: SummaryState) -> str:
+    if st.error:
+        return "finish"
+    if not st.is_good:
+        return "refine"
+    return "translate"
+
+
+def post_refine(st: SummaryState) -> str:
+    if st.error:
+        return "finish"
+    if "not related to the document content" in st.answer or st.refine_count > 3:
+        return "translate"
+    else:
+        return "RAG_router"
+
+
+def post_summarize(st: SummaryState) -> str:
+    return "finish" if st.error else "translate"
+
+
+_BRANCHES: Dict[str, Tuple[Callable[[SummaryState], str], Dict[str, str]]] = {
+    "entry": (entry_branch, {
+        "translate": "translate",
+        "RAG_router": "RAG_router",
+        "load": "load",
+        "finish": "finish",
+    }),
+    "load": (post_load, {
+        "embed": "embed",
+        "finish": "finish",
+    }),
+    "embed": (post_embed, {
+        "RAG_router": "RAG_router",
+        "finish": "finish",
+    }),
+    "RAG_router": (post_RAG_router, {
+        "retrieve_web": "retrieve_web",
+        "retrieve_vector": "retrieve_vector",
+        "summarize": "summarize",
+        "finish": "finish",
+    }),
+    "retrieve_web": (post_retrieve_web, {
+        "grade": "grade",
+        "finish": "finish",
+    }),
+    "retrieve_vector": (post_retrieve_vector, {
+        "grade": "grade",
+        "finish": "finish",
+    }),
+    "grade": (post_grade, {
+        "translate": "translate",
+        "generate": "generate",
+        "finish": "finish",
+    }),
+    "generate": (post_generate, {
+        "verify": "verify",
+        "finish": "finish",
+    }),
+    "verify": (post_verify, {
+        "refine": "refine",
+        "finish": "finish",
+        "translate": "translate",
+    }),
+    "refine": (post_refine, {
+        "RAG_router": "RAG_router",
+        "translate": "translate",
+        "finish": "finish",
+    }),
+    "summarize": (post_summarize, {
+        "translate": "translate",
+        "finish": "finish",
+    }),
+}
+
+
 # ---------------------------------------------------------------------------
 # Graph builder
 # ---------------------------------------------------------------------------
@@ -120,6 +342,78 @@ class SummaryGraphBuilder:
     ):
         self.loader, self.store, self.web_search, self.llm, self.cache = loader, store, web_search, llm, cache
 
+    async def _ensure_summary(self, st: SummaryState) -> str:
+        """문서 요약을 반환하되, 없을 때만 전체 청크로 한 번 생성해 캐시에 저장한다.
+
+        SUMMARY_ALL 경로와 RAG 경로가 같은 요약을 공유하므로, 일반 질의에서 만든
+        요약도 저장해 같은 파일의 후속 질의·전체 요약 요청이 재요약하지 않게 한다.
+        캐시 저장 실패는 요약 결과에 영향을 주지 않는다.
+        """
+        if st.summary is not None:
+            return st.summary
+        if st.chunks is None:
+            st.chunks = await self.store.get_all(st.file_id)  # type: ignore[arg-type]
+        st.summary = await self.llm.summarize(st.chunks)  # type: ignore[arg-type]
+        try:
+            await self.cache.set_summary(st.file_id, st.summary)
+        except Exception as e:  # noqa: BLE001
+            log.warning("[CACHE] set_summary 실패: %s", e)
+        return st.summary
+
+    async def _grade_batch(self, st: SummaryState) -> Optional[List[int]]:
+        """검색된 청크 전체를 한 번의 LLM 호출로 평가해 관련 청크 인덱스를 반환한다.
+
+        응답이 청크 수와 같은 길이의 yes/no JSON 배열이 아니면 None 을 반환해
+        호출자가 청크별 평가로 폴백하게 한다.
+        """
+        chunks = st.retrieved or []
+        prompt = PROMPT_GRADE_BATCH.format(
+            summary=st.summary,
+            query=st.query,
+            count=len(chunks),
+            chunks="\n\n".join(f"[{i}] {c}" for i, c in enumerate(chunks)),
+        )
+        result = await self._judge(
+            st.file_id, prompt, valid=lambda r: _parse_verdicts(r, len(chunks)) is not None
+        )
+
+        verdicts = _parse_verdicts(result, len(chunks))
+        if verdicts is None:
+            st.log.append("grade batch unparsable, falling back")
+            return None
+        return [
+            i for i, v in enumerate(verdicts)
+            if v is True or (isinstance(v, str) and "yes" in v.lower())
+        ]
+
+    async def _judge(
+        self, file_id: str, prompt: str, valid: Callable[[str], bool]
+    ) -> str:
+        """판정(think=True) 프롬프트를 응답 캐시를 거쳐 LLM에 보낸다.
+
+        공백을 정규화한 프롬프트 전체의 sha256 을 키로 쓰므로, 같은 파일에 같은
+        질문·청크가 다시 들어오면 LLM 호출 없이 이전 판정을 돌려준다. 템플릿이
+        바뀌면 해시도 바뀌어 자연히 무효화된다. 캐시 오류는 무시하고 LLM 으로 진행한다.
+        `valid` 를 통과하지 못한 응답(빈 응답 포함)은 캐시하지 않아 다음 요청에서 다시 묻는다.
+        """
+        digest = hashlib.sha256(_WS_RE.sub(" ", prompt).strip().encode()).hexdigest()
+        try:
+            hit = await self.cache.get_llm_response(file_id, digest)
+        except Exception as e:  # noqa: BLE001
+            log.warning("[CACHE] llm response get 실패: %s", e)
+            hit = None
+        if hit is not None:
+            return hit
+
+        result = await self.llm.execute(prompt, think=True)
+        if not result.strip() or not valid(result):
+            return result
+        try:
+            await self.cache.set_llm_response(file_id, digest, result)
+        except Exception as e:  # noqa: BLE001
+            log.warning("[CACHE] llm response set 실패: %s", e)
+        return result
+
     # ------------------------------------------------------------------
     def build(self):
         g = StateGraph(SummaryState)
@@ -137,30 +431,35 @@ class SummaryGraphBuilder:
                 초기 변수(is_summary, cached, embedded 등)가 설정된 상태 객체.
             """
             st.is_summary = st.query.strip().upper() == "SUMMARY_ALL"
-            st.cached = self.cache.exists_summary(st.file_id)
-            if st.cached:
-                st.summary = self.cache.get_summary(st.file_id)
-            st.embedded = await self.store.has_chunks(st.file_id)  # type: ignore[arg-type]
-            
-            # 로그 기록은 서브 기능이므로 실패해도 작동을 멈추지 않고 계속 진행한다.
-            try:
-                self.cache.set_log(
-                    st.file_id, st.url, st.query, st.lang, msg="entry"
-                )
-            except Exception as e:  # noqa: BLE001
-                print(f"[LOG] entry set_log 실패: {e}")
 
+            async def _log_entry():
+                # 로그 기록은 서브 기능이므로 실패해도 작동을 멈추지 않고 계속 진행한다.
+                try:
+                    await self.cache.set_log(
+                        st.file_id, st.url, st.query, st.lang, msg="entry"
+                    )
+                except Exception as e:  # noqa: BLE001
+                    log.warning("[LOG] entry set_log 실패: %s", e)
+
+            # 요약 조회(존재 확인 겸용)·청크 존재 확인·로그 기록은 서로 독립적이므로
+            # 동시에 실행해 노드 지연을 합이 아닌 최댓값으로 줄인다.
+            summary, has_chunks, _ = await asyncio.gather(
+                self.cache.get_summary(st.file_id),
+                self.store.has_chunks(st.file_id),  # type: ignore[arg-type]
+                _log_entry(),
+            )
+            # 컬렉션이 확실히 없는데(False) 요약만 남아 있으면 이전 업로드의 요약이다.
+            # 같은 file_id 로 다시 올라온 문서는 load/embed 를 새로 거치므로 낡은 요약은
+            # 쓰지 않고 `_ensure_summary` 가 새 요약으로 덮어쓴다. 확인 실패(None)는
+            # 일시적 Chroma 오류일 수 있으므로 캐시된 요약을 그대로 쓴다.
+            if summary is not None and has_chunks is False:
+                st.log.append("stale summary ignored: no chunks")
+                summary = None
+            st.cached = summary is not None
+            st.summary = summary
+            st.embedded = bool(has_chunks)
             return st
 
-        def entry_branch(st: SummaryState) -> str:
-            if st.error:
-                return "finish"
-            if st.is_summary:
-                if st.cached:
-                    return "translate"
-                return "RAG_router" if st.embedded else "load"
-            return "RAG_router" if st.embedded else "load"
-
         g.add_node("entry", entry_router)
 
         # 1. Load PDF ---------------------------------------------------
@@ -202,7 +501,7 @@ class SummaryGraphBuilder:
         # 3-S. Summarize -----------------------------------------------
         @safe_retry
         async def summarize(st: SummaryState):
-            """텍스트 청크를 요약한다.
+            """텍스트 청크를 요약하고 캐시에 저장한다.
 
             Args:
                 st: 현재 요청 상태.
@@ -210,9 +509,7 @@ class SummaryGraphBuilder:
             Returns:
                 요약된 텍스트 청크가 추가된 상태 객체.
             """
-            if st.chunks is None:
-                st.chunks = await self.store.get_all(st.file_id)  # type: ignore[arg-type]
-            st.summary = await self.llm.summarize(st.chunks)  # type: ignore[arg-type]
+            await self._ensure_summary(st)
             return st
 
         g.add_node("summarize", summarize)
@@ -233,35 +530,16 @@ class SummaryGraphBuilder:
             if st.is_summary:
                 return st
             
-            if st.cached:
-                st.summary = self.cache.get_summary(st.file_id)
-            else:
-                st.chunks = await self.store.get_all(st.file_id)
-                st.summary = await self.llm.summarize(st.chunks)
-                
-            prompt = PROMPT_DETERMINE_WEB.render(query=st.query, summary=st.summary)
-            result = await self.llm.execute(prompt, think=True)
+            await self._ensure_summary(st)
+
+            prompt = PROMPT_DETERMINE_WEB.format(query=st.query, summary=st.summary)
+            result = await self._judge(st.file_id, prompt, valid=_one_word("true", "false"))
             st.is_web = "true" in result.lower()
             
             return st
         
         g.add_node("RAG_router", RAG_router)
-        
-        def post_RAG_router(st: SummaryState) -> str:
-            if st.error:
-                return "finish"
-            if st.is_summary:
-                return "summarize"
-            return "retrieve_web" if st.is_web else "retrieve_vector"
-    
-    
-        g.add_conditional_edges("RAG_router", post_RAG_router, {
-            "retrieve_web":  "retrieve_web",
-            "retrieve_vector":  "retrieve_vector",
-            "summarize":    "summarize",
-            "finish":    "finish",
-        })
-        
+
         @safe_retry
         async def retrieve_web(st: SummaryState):
             """외부 검색 엔진을 통해 검색 결과를 가져온다.
@@ -284,13 +562,7 @@ class SummaryGraphBuilder:
             return st
         
         g.add_node("retrieve_web", retrieve_web)
-        
-        def post_retrieve_web(st: SummaryState) -> str:
-            if st.error:
-                return "finish"
-            else:
-                return "grade"
-        
+
         @safe_retry
         async def retrieve_vector(st: SummaryState):
             """벡터스토어에서 유사도 검색을 통해 검색 결과를 가져온다.
@@ -303,25 +575,9 @@ class SummaryGraphBuilder:
             """
             st.retrieved = await self.store.similarity_search(st.file_id, st.query, k=8)
             return st
-        
-        def post_retrieve_vector(st: SummaryState) -> str:
-            if st.error:
-                return "finish"
-            else:
-                return "grade"
-        
+
         g.add_node("retrieve_vector", retrieve_vector)
-        
-        g.add_conditional_edges("retrieve_vector", post_retrieve_vector, {
-            "grade": "grade",
-            "finish": "finish",
-        })
-        
-        g.add_conditional_edges("retrieve_web", post_retrieve_web, {
-            "grade": "grade",
-            "finish": "finish",
-        })
-        
+
         @safe_retry
         async def grade(st: SummaryState):
             """
@@ -337,35 +593,48 @@ class SummaryGraphBuilder:
                 st.error = "No relevant chunks"
                 return st
             
-            good_chunks = []
-            for chunk in st.retrieved:
-                prompt = PROMPT_GRADE.render(query=st.query, summary=st.summary, chunk=chunk)
-                result = await self.llm.execute(prompt, think=True)
-                if "yes" in result.lower():
-                    good_chunks.append(chunk)
+            # 1) 모든 청크를 한 번의 호출로 평가한다 (요약·질의 프리픽스도 한 번만 전송).
+            good_idx = await self._grade_batch(st)
+
+            # 2) 응답을 해석할 수 없으면 청크별 평가로 폴백한다.
+            if good_idx is None:
+                # 청크별 판정은 서로 독립적이므로 동시에 호출하되, 세마포어로 팬아웃을 제한한다.
+                # 결과는 검색 순위 순으로 확인하다가 `_GRADE_TOP_N` 개가 채워지면 나머지는 취소한다.
+                render = partial_prompt(PROMPT_GRADE, "chunk", query=st.query, summary=st.summary)
+
+                async def _grade_one(chunk: TextChunk) -> str:
+                    prompt = render(chunk)
+                    async with _GRADE_SEM:
+                        return await self._judge(
+                            st.file_id, prompt, valid=_one_word("yes", "no")
+                        )
+
+                tasks = [asyncio.create_task(_grade_one(c)) for c in st.retrieved]
+                good_idx = []
+                try:
+                    for idx, task in enumerate(tasks):
+                        if "yes" in (await task).lower():
+                            good_idx.append(idx)
+                            if len(good_idx) >= _GRADE_TOP_N:
+                                break
+                finally:
+                    cancelled = sum(t.cancel() for t in tasks)
+                    # 취소된 태스크도 회수해 "Task exception was never retrieved" 를 막는다.
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                if cancelled:
+                    st.log.append(f"grade early stop: {cancelled} cancelled")
+
+            # 검색 순위(유사도 순)는 유지한다.
+            good_chunks = [st.retrieved[i] for i in sorted(good_idx)]
             
             if len(good_chunks) == 0:
-                st.answer = "I'm sorry, I can't find the answer to your question even though I read all the documents. Please ask a question about the document's content."
+                st.answer = _NO_ANSWER
                 return st
             st.retrieved = good_chunks
             return st
         
         g.add_node("grade", grade)
-        
-        def post_grade(st: SummaryState) -> str:
-            if st.answer == "I'm sorry, I can't find the answer to your question even though I read all the documents. Please ask a question about the document's content.":
-                return "translate"
-            if st.error:
-                return "finish"
-            else:
-                return "generate"
-        
-        g.add_conditional_edges("grade", post_grade, {
-            "translate": "translate",
-            "generate": "generate",
-            "finish": "finish",
-        })
-        
+
         @safe_retry
         async def generate(st: SummaryState):
             """Retrieved된 청크를 바탕으로 쿼리문에 대한 답변을 생성한다.
@@ -376,20 +645,12 @@ class SummaryGraphBuilder:
             Returns:
                 생성된 답변이 추가된 상태 객체.(st.answer)
             """
-            prompt = PROMPT_GENERATE.render(query=st.query, retrieved=st.retrieved)
+            prompt = PROMPT_GENERATE.format(query=st.query, retrieved=st.retrieved)
             st.answer = await self.llm.execute(prompt)
             return st
         
         g.add_node("generate", generate)
-        
-        def post_generate(st: SummaryState) -> str:
-            return "finish" if st.error else "verify"
-        
-        g.add_conditional_edges("generate", post_generate, {
-            "verify": "verify",
-            "finish": "finish",
-        })
-        
+
         @safe_retry
         async def verify(st: SummaryState):
             """생성된 답변이 쿼리에 대한 적절한 답변인지 판별하고, 관련 없는 경우 리파인 프로세스를 진행한다.
@@ -401,32 +662,18 @@ class SummaryGraphBuilder:
                 리파인 프로세스가 진행된 상태 객체.(st.query)
             """
             
-            prompt = PROMPT_VERIFY.render(
+            prompt = PROMPT_VERIFY.format(
                 query=st.query,
                 summary=st.summary,
                 retrieved=st.retrieved,
                 answer=st.answer,
             )
-            result = await self.llm.execute(prompt, think=True)
+            result = await self._judge(st.file_id, prompt, valid=_one_word("good", "bad"))
             st.is_good = "good" in result.lower()
             return st
         
         g.add_node("verify", verify)
-        
-        def post_verify(st: SummaryState) -> str:
-            if st.error:
-                return "finish"
-            if not st.is_good:
-                return "refine"
-            return "save" if st.is_summary else "translate"
-        
-        g.add_conditional_edges("verify", post_verify, {
-            "save": "save",
-            "refine": "refine",
-            "finish": "finish",
-            "translate": "translate",
-        })
-        
+
         @safe_retry
         async def refine(st: SummaryState):
             """쿼리문을 개선하여 더 정확한 답변을 얻기 위한 작업을을 진행한다.
@@ -440,10 +687,10 @@ class SummaryGraphBuilder:
             """
             st.refine_count += 1
             if st.refine_count > 3:
-                st.answer = "I'm sorry, I can't find the answer to your question even though I read all the documents. Please ask a question about the document's content."
+                st.answer = _NO_ANSWER
                 return st
             
-            prompt = PROMPT_REFINE.render(
+            prompt = PROMPT_REFINE.format(
                 summary=st.summary,
                 query=st.query,
                 retrieved=st.retrieved,
@@ -459,39 +706,6 @@ class SummaryGraphBuilder:
             return st
         
         g.add_node("refine", refine)
-        
-        def post_refine(st: SummaryState) -> str:
-            if st.error:
-                return "finish"
-            if "not related to the document content" in st.answer or st.refine_count > 3:
-                return "translate"
-            else:
-                return "RAG_router"
-        g.add_conditional_edges("refine", post_refine, {
-            "RAG_router": "RAG_router",
-            "translate": "translate",
-            "finish": "finish",
-        })
-        
-        # 5. Save summary ----------------------------------------------
-        @safe_retry
-        async def save_summary(st: SummaryState):
-            """요약 데이터를 캐시에 저장한다.
-
-            Args:
-                st: 현재 요청 상태.
-
-            Returns:
-                요약 데이터가 캐시에 저장된 상태 객체.
-            """
-            if st.is_summary and not st.cached and st.summary:
-                self.cache.set_summary(st.file_id, st.summary)
-            return st
-
-        g.add_node("save", save_summary)
-
-        def post_save_summary(st: SummaryState) -> str:
-            return "finish" if st.error else "translate"
 
         @safe_retry
         async def translate(st: SummaryState):
@@ -504,15 +718,14 @@ class SummaryGraphBuilder:
                 번역된 답변이 추가된 상태 객체.(st.answer)
             """
             if st.is_summary:
-                text = self.cache.get_summary(st.file_id)
+                text = await self._ensure_summary(st)
             else:
                 text = st.answer
 
-            prompt = PROMPT_TRANSLATE.render(lang=st.lang, text=text)
+            prompt = PROMPT_TRANSLATE.format(lang=st.lang, text=text)
             st.answer = await self.llm.execute(prompt)
             return st
 
-
         # 6. Translate & finish ----------------------------------------
         g.add_node("translate", translate)
         async def finish_node(st: SummaryState):
@@ -527,11 +740,11 @@ class SummaryGraphBuilder:
             msg = st.error if st.error else " | ".join(st.log or [])
             # 로그 기록은 서브 기능이므로 실패해도 작동을 멈추지 않고 계속 진행한다.
             try:
-                self.cache.set_log(
+                await self.cache.set_log(
                     st.file_id, st.url, st.query, st.lang, msg=msg
                 )
             except Exception as e:  # noqa: BLE001
-                print(f"[LOG] finish set_log 실패: {e}")
+                log.warning("[LOG] finish set_log 실패: %s", e)
             return st
 
         g.add_node("finish", finish_node)
@@ -539,40 +752,8 @@ class SummaryGraphBuilder:
         # Routing -------------------------------------------------------
         g.set_entry_point("entry")
 
-        g.add_conditional_edges("entry", entry_branch, {
-            "translate": "translate",
-            "RAG_router":  "RAG_router",
-            "load":      "load",
-            "finish":    "finish",
-        })
-
-        def post_load(st: SummaryState) -> str:
-            return "finish" if st.error else "embed"
-
-        g.add_conditional_edges("load", post_load, {
-            "embed":  "embed",
-            "finish": "finish",
-        })
-
-        def post_embed(st: SummaryState) -> str:
-            return "finish" if st.error else "RAG_router"
-
-        g.add_conditional_edges("embed", post_embed, {
-            "RAG_router":  "RAG_router",
-            "finish":    "finish",
-        })
-
-        g.add_edge("summarize",  "save")
-        
-        # --- save 노드 → translate / finish 분기 --------------------
-        g.add_conditional_edges(
-            "save",
-            post_save_summary,
-            {
-                "translate": "translate",
-                "finish": "finish",
-            },
-        )
+        for node, (branch, path_map) in _BRANCHES.items():
+            g.add_conditional_edges(node, branch, path_map)
 
         g.add_edge("translate",  "finish")
 
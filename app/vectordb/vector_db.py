@@ -9,13 +9,14 @@ from __future__ import annotations
 
 import os
 import threading
+from collections import OrderedDict
 from datetime import datetime
 from functools import lru_cache
-from typing import List, Union
+from typing import List, Optional, Union
 
 import chromadb
+import chromadb.errors
 from chromadb.config import Settings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
@@ -23,10 +24,9 @@ from langchain_community.embeddings import HuggingFaceEmbeddings
 from zoneinfo import ZoneInfo
 
 from app.cache.cache_db import get_cache_db   # 삭제 로그용
+from app.infra.text_splitter import VECTOR_SPLITTER
 
 # ─────────────────────── 설정 상수 ──────────────────────────
-CHUNK_SIZE      = 3000
-CHUNK_OVERLAP   = 300
 _BATCH_SIZE     = 500
 
 CHROMA_HOST     = os.getenv("CHROMA_HOST", "localhost")
@@ -37,6 +37,17 @@ EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME")
 
 _PERSIST_DIR    = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
 
+_TZ             = ZoneInfo("Asia/Seoul")
+
+_VS_CACHE_SIZE  = 1024   # 재사용할 Chroma 래퍼(컬렉션) 최대 개수
+
+# "컬렉션 없음" 예외 (0.5.x: InvalidCollectionException, 0.6+: NotFoundError, 구버전: ValueError)
+_MISSING_COLLECTION = tuple(
+    getattr(chromadb.errors, name)
+    for name in ("NotFoundError", "InvalidCollectionException")
+    if hasattr(chromadb.errors, name)
+) + (ValueError,)
+
 # ───────────────── Embedding 모델 선택 ────────────────────
 def _get_embedding_model():
     """환경 변수 설정에 따라 임베딩 모델(OpenAI/HF)을 반환한다."""
@@ -55,23 +66,30 @@ class VectorDB:
     -----
     - Chroma 클라이언트는 lazy 연결로 성능 이슈를 줄인다.
     - `store`에서 청크 분할·임베딩·문서 저장을 한 번에 처리한다.
+      임베딩은 한 번에 계산해 Chroma 컬렉션에 직접 upsert 한다.
     """
 
     def __init__(self) -> None:
         self.embeddings = _get_embedding_model()
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP,
-            length_function=len,
-        )
+        self.text_splitter = VECTOR_SPLITTER
 
-        self._lock   = threading.RLock()
+        # 쓰기(upsert·delete)만 직렬화한다. 재진입이 없으므로 RLock 대신 Lock.
+        # 읽기 경로는 긴 upsert 를 기다리지 않도록 별도 잠금만 짧게 잡는다.
+        self._lock   = threading.Lock()
+        self._client_lock = threading.Lock()      # lazy 연결 1회 생성용
+        self._stores_lock = threading.Lock()      # 래퍼 LRU 갱신용
         self._client = None                       
+        self._stores: "OrderedDict[str, Chroma]" = OrderedDict()
 
     # ──────────── Chroma client (lazy) ────────────
     @property
     def client(self) -> chromadb.HttpClient | None:
-        if self._client is None:
+        # 연결된 뒤에는 잠금 없이 반환하고, 최초 연결만 double-checked locking 으로 한 번 만든다.
+        if self._client is not None:
+            return self._client
+        with self._client_lock:
+            if self._client is not None:
+                return self._client
             try:
                 print(f"[VectorDB] Connecting → {CHROMA_HOST}:{CHROMA_PORT}")
                 self._client = chromadb.HttpClient(
@@ -89,15 +107,40 @@ class VectorDB:
         return file_id
 
     def _get_vectorstore(self, file_id_or_col: str) -> Chroma:
-        """Chroma 컬렉션 객체를 반환한다."""
+        """Chroma 컬렉션 객체를 반환한다.
+
+        컬렉션별 래퍼는 LRU(`_VS_CACHE_SIZE`)로 재사용해, 검색마다 래퍼 생성과
+        컬렉션 조회 RPC 를 반복하지 않는다. 삭제 시 `delete_document` 가 비운다.
+        쓰기 잠금과 분리된 `_stores_lock` 만 사용한다.
+
+        LRU 는 프로세스 로컬이라 다른 워커가 컬렉션을 지우고 다시 만들면 여기 남은
+        래퍼는 옛 컬렉션을 가리킨다. 그런 래퍼가 실패하면 `_evict_vectorstore` 로
+        버리고 새로 만든다(`get_docs` 참고).
+        """
+        with self._stores_lock:
+            vs = self._stores.get(file_id_or_col)
+            if vs is not None:
+                self._stores.move_to_end(file_id_or_col)
+                return vs
+
         if self.client is None:
             raise RuntimeError("Chroma client not available")
-        return Chroma(
+        vs = Chroma(
             client=self.client,
             collection_name=file_id_or_col,
             embedding_function=self.embeddings,
             persist_directory=_PERSIST_DIR,
         )
+        with self._stores_lock:
+            self._stores[file_id_or_col] = vs
+            if len(self._stores) > _VS_CACHE_SIZE:
+                self._stores.popitem(last=False)
+        return vs
+
+    def _evict_vectorstore(self, col_name: str) -> None:
+        """캐시된 Chroma 래퍼를 버린다."""
+        with self._stores_lock:
+            self._stores.pop(col_name, None)
 
     # ------------- CRUD 메서드 ----------------------------
     def store(self, content: Union[str, List[str]], file_id: str) -> None:
@@ -112,36 +155,53 @@ class VectorDB:
                 print(f"[VectorDB.store] ⚠️ no chunks for {file_id}")
                 return
 
-            today = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d")
-            docs: List[Document] = [
-                Document(
-                    page_content=ck,
-                    metadata={
-                        "file_id": file_id,
-                        "chunk_index": idx,
-                        "date": today,
-                    },
-                )
-                for idx, ck in enumerate(chunks)
+            today = datetime.now(_TZ).date().isoformat()
+            # 0 채움 ID: 사전순 = chunk_index 순이라 조회 결과가 대부분 이미 정렬돼 있다.
+            ids = [f"{file_id}-{idx:08d}" for idx in range(len(chunks))]
+            metas = [
+                {"file_id": file_id, "chunk_index": idx, "date": today}
+                for idx in range(len(chunks))
             ]
 
-            vs = self._get_vectorstore(self._get_collection_name(file_id))
+            # 임베딩은 전체 청크를 한 번에 요청하고(제공자 측 배치 활용),
+            # Chroma 에는 계산된 벡터를 그대로 넣어 배치마다 다시 임베딩하지 않는다.
+            # `_BATCH_SIZE` 분할은 Chroma RPC 페이로드 크기 제한용으로만 남긴다.
+            vectors = self.embeddings.embed_documents(list(chunks))
+            if self.client is None:
+                raise RuntimeError("Chroma client not available")
+            col = self.client.get_or_create_collection(
+                self._get_collection_name(file_id),
+                embedding_function=None,  # langchain_chroma 와 동일: 벡터는 직접 넣는다
+            )
             with self._lock:
-                for i in range(0, len(docs), _BATCH_SIZE):
+                for i in range(0, len(chunks), _BATCH_SIZE):
+                    j = i + _BATCH_SIZE
                     try:
-                        vs.add_documents(docs[i : i + _BATCH_SIZE])
+                        col.upsert(
+                            ids=ids[i:j],
+                            embeddings=vectors[i:j],
+                            documents=chunks[i:j],
+                            metadatas=metas[i:j],
+                        )
                     except Exception as e:
                         print(f"[VectorDB.store] batch {i//_BATCH_SIZE} fail: {e}")
 
-            print(f"[VectorDB.store] ✅ stored {len(docs)} docs for {file_id}")
+            print(f"[VectorDB.store] ✅ stored {len(chunks)} docs for {file_id}")
 
         except Exception as e:
             print(f"[VectorDB.store] ❌ {e}")
 
     def get_docs(self, file_id: str, query: str, k: int = 8) -> List[Document]:
         """유사도 검색 결과를 반환한다."""
+        col_name = self._get_collection_name(file_id)
         try:
-            return self._get_vectorstore(self._get_collection_name(file_id)).similarity_search(query, k=k)
+            try:
+                return self._get_vectorstore(col_name).similarity_search(query, k=k)
+            except Exception as e:
+                # 다른 워커가 컬렉션을 재생성했다면 캐시된 래퍼가 낡았을 수 있다 → 한 번만 재시도.
+                print(f"[VectorDB.get_docs] ⚠️ stale store {col_name}, retrying: {e}")
+                self._evict_vectorstore(col_name)
+                return self._get_vectorstore(col_name).similarity_search(query, k=k)
         except Exception as e:
             print(f"[VectorDB.get_docs] ❌ {e}")
             return []
@@ -154,27 +214,42 @@ class VectorDB:
             docs_raw  = data.get("documents", [])
             metas_raw = data.get("metadatas", [{}] * len(docs_raw))
 
-            items = sorted(
-                zip(docs_raw, metas_raw),
-                key=lambda x: x[1].get("chunk_index", 0),
-            )
-            return [Document(page_content=d, metadata=m) for d, m in items]
+            # 이미 chunk_index 순이면(일반적인 경우) 정렬을 생략한다.
+            order = [(m or {}).get("chunk_index", 0) for m in metas_raw]
+            idx = range(len(docs_raw))
+            if any(a > b for a, b in zip(order, order[1:])):
+                idx = sorted(idx, key=order.__getitem__)
+            return [Document(page_content=docs_raw[i], metadata=metas_raw[i]) for i in idx]
         except Exception as e:
             print(f"[VectorDB.get_all_chunks] ❌ {e}")
             return []
 
-    def has_chunks(self, file_id: str) -> bool:
-        """해당 파일에 저장된 청크가 하나라도 있는지 확인."""
+    def has_chunks(self, file_id: str) -> Optional[bool]:
+        """해당 파일에 저장된 청크가 하나라도 있는지 확인.
+
+        컬렉션이 없으면 False, 연결 오류 등으로 확인하지 못하면 None 을 반환해
+        호출자가 "청크 없음" 과 "모름" 을 구분할 수 있게 한다.
+        """
         try:
             return self.client.get_collection(self._get_collection_name(file_id)).count() > 0  # type: ignore
-        except Exception:
+        except _MISSING_COLLECTION:
             return False
+        except Exception as e:
+            print(f"[VectorDB.has_chunks] ❌ {e}")
+            return None
 
     def delete_document(self, file_id: str) -> bool:
         """컬렉션 전체를 삭제하고 로그를 남긴다."""
         try:
-            with self._lock:
-                self.client.delete_collection(self._get_collection_name(file_id))  # type: ignore
+            col_name = self._get_collection_name(file_id)
+            # 컬렉션을 먼저 지우고 같은 `_stores_lock` 구간에서 래퍼를 비워,
+            # 그 사이 조회가 삭제 직전 래퍼를 다시 캐시하지 못하게 한다.
+            # 잠금 순서는 항상 `_lock` → `_stores_lock`.
+            with self._lock, self._stores_lock:
+                self.client.delete_collection(col_name)  # type: ignore
+                self._stores.pop(col_name, None)
+            # 청크가 사라지면 그 청크로 만든 LLM 판정 캐시도 무효다.
+            get_cache_db().delete_llm_responses(file_id)
             self._log_vector_deletion(file_id)
             return True
         except Exception as e:
@@ -0,0 +1,29 @@
+"""summary_graph_builder 의 grade 응답 파서 테스트."""
+import pytest
+
+pytest.importorskip("langgraph")
+
+from app.service.summary_graph_builder import _parse_verdicts  # noqa: E402
+
+
+def test_parse_plain_array():
+    assert _parse_verdicts('["yes", "no", "yes"]', 3) == ["yes", "no", "yes"]
+
+
+def test_parse_ignores_chunk_labels_before_array():
+    reply = 'Chunk [0] answers the query, [1] does not.\n["yes", "no"]'
+    assert _parse_verdicts(reply, 2) == ["yes", "no"]
+
+
+def test_parse_ignores_brackets_after_array():
+    reply = '["no", "yes"]\n(see [1] for details)'
+    assert _parse_verdicts(reply, 2) == ["no", "yes"]
+
+
+def test_parse_rejects_wrong_length():
+    assert _parse_verdicts('["yes"]', 2) is None
+
+
+def test_parse_rejects_missing_array():
+    assert _parse_verdicts("I cannot judge these chunks.", 2) is None
+    assert _parse_verdicts("", 1) is None